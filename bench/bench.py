@@ -0,0 +1,246 @@
+"""Benchmark the scheduling scripts against the in-memory fake calendar.
+
+Each command's core logic runs on synthetic days of 10 to 10k events, with
+all-day events, recurring instances and mixed timezones. Wall time, API
+calls, bytes transferred and peak memory are written to JSON:
+
+    python bench/bench.py --output bench-new.json
+    python bench/bench.py --baseline bench-old.json --threshold 0.2
+
+With --baseline the run exits non-zero when a command got slower, or made
+more API calls, by more than the threshold.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from google.oauth2.credentials import Credentials
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from pyplan.aio import AsyncCalendar, httpx  # noqa: E402
+from pyplan.commands import prayer, replace, restore, shrink, urgent  # noqa: E402
+from pyplan.fake import FakeCalendar, fake_service  # noqa: E402
+from pyplan.ratelimit import calendar_limiter  # noqa: E402
+
+SIZES = [10, 100, 1000, 10000]
+COMMANDS = ["shrink", "shrink-async", "restore", "urgent", "replace", "prayer"]
+TIMEZONES = [
+    ("UTC", timezone.utc),
+    ("Europe/Istanbul", timezone(timedelta(hours=3))),
+    ("America/New_York", timezone(timedelta(hours=-5))),
+]
+PRAYER_TIMES = {
+    "Sunrise": {"name": "Sabah", "time": "06:45"},
+    "Dhuhr": {"name": "Öğle", "time": "13:05"},
+    "Asr": {"name": "İkindi", "time": "16:20"},
+    "Maghrib": {"name": "Akşam", "time": "19:10"},
+    "Isha": {"name": "Yatsı", "time": "20:40"},
+}
+
+
+def synthetic_day(day, count, seed=0):
+    """Events spread over one UTC day.
+
+    Roughly 5% are all-day events and 20% are instances of recurring events;
+    timed events use a mix of timezone offsets.
+    """
+    rng = random.Random(seed)
+    day_start = datetime.combine(day, datetime.min.time(), timezone.utc)
+    events = []
+
+    for index in range(count):
+        event = {
+            "summary": f"Synthetic event {index}",
+            "description": "x" * rng.randint(0, 200),
+            "colorId": str(rng.randint(1, 11)),
+        }
+        kind = rng.random()
+
+        if kind < 0.05:
+            event["start"] = {"date": day.isoformat()}
+            event["end"] = {"date": (day + timedelta(days=1)).isoformat()}
+        else:
+            start = day_start + timedelta(minutes=rng.randrange(0, 24 * 60 - 60))
+            end = start + timedelta(minutes=rng.choice([5, 15, 30, 45, 60]))
+            name, tz = rng.choice(TIMEZONES)
+            event["start"] = {
+                "dateTime": start.astimezone(tz).isoformat(),
+                "timeZone": name,
+            }
+            event["end"] = {
+                "dateTime": end.astimezone(tz).isoformat(),
+                "timeZone": name,
+            }
+
+            if kind < 0.25:
+                series = f"series{index % 7}"
+                event["id"] = f"{series}_{start.strftime('%Y%m%dT%H%M%SZ')}{index}"
+                event["recurringEventId"] = series
+                event["originalStartTime"] = dict(event["start"])
+
+        events.append(event)
+
+    events.sort(key=lambda event: event["start"].get("dateTime", ""))
+    return events
+
+
+def prepare(command, service):
+    """Untimed setup some commands need, e.g. a snapshot to restore."""
+    if command == "restore":
+        shrink.shrink_calendar(service, "primary")
+
+
+async def shrink_async(fake):
+    """shrink through the asyncio client, sending its requests to the fake."""
+    client = httpx.AsyncClient(transport=fake.httpx_transport())
+    async with AsyncCalendar(Credentials("fake-token"), client=client) as calendar:
+        await shrink.shrink_calendar_async(calendar, "primary")
+
+
+def run(command, service, today, fake):
+    if command == "shrink":
+        shrink.shrink_calendar(service, "primary")
+    elif command == "shrink-async":
+        asyncio.run(shrink_async(fake))
+    elif command == "restore":
+        restore.restore_calendar(service, "primary")
+    elif command == "urgent":
+        urgent.add_urgent_task(service, "primary", "Benchmark task", 30, "1")
+    elif command == "replace":
+        replace.replace_day(service, "primary", today, today + timedelta(days=1))
+    elif command == "prayer":
+        prayer.schedule_prayer_events(service, PRAYER_TIMES, "primary")
+
+
+def measure(command, size, trace_memory):
+    """Run one command once on a fresh fake calendar in a scratch directory."""
+    today = datetime.now(timezone.utc).date()
+    fake = FakeCalendar()
+    fake.add_events("primary", synthetic_day(today, size))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        os.mkdir("secrets")
+        try:
+            service = fake_service(fake)
+            with contextlib.redirect_stdout(io.StringIO()):
+                prepare(command, service)
+                fake.reset_stats()
+
+                if trace_memory:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                run(command, service, today, fake)
+                wall_time = time.perf_counter() - started
+                peak_memory = None
+                if trace_memory:
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "wall_time": wall_time,
+        "peak_memory": peak_memory,
+        "api_calls": dict(fake.calls),
+        "total_api_calls": sum(fake.calls.values()),
+        "http_requests": fake.http_requests,
+        "bytes_sent": fake.bytes_sent,
+        "bytes_received": fake.bytes_received,
+    }
+
+
+def benchmark(commands, sizes, repeat):
+    results = []
+    for command in commands:
+        for size in sizes:
+            runs = [measure(command, size, trace_memory=False) for _ in range(repeat)]
+            result = min(runs, key=lambda run: run["wall_time"])
+            result["peak_memory"] = measure(command, size, trace_memory=True)[
+                "peak_memory"
+            ]
+            result.update(command=command, events=size)
+            results.append(result)
+            print(
+                f"{command:12} {size:6} events  {result['wall_time'] * 1000:9.1f} ms  "
+                f"{result['total_api_calls']:6} calls  "
+                f"{(result['bytes_sent'] + result['bytes_received']) / 1024:9.1f} KiB  "
+                f"{result['peak_memory'] / 1024 / 1024:7.1f} MiB peak"
+            )
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Compare wall time and API calls against a baseline run."""
+    previous = {(result["command"], result["events"]): result for result in baseline}
+    found = []
+    for result in results:
+        old = previous.get((result["command"], result["events"]))
+        if old is None:
+            continue
+        for metric in ("wall_time", "total_api_calls"):
+            if old[metric] and result[metric] > old[metric] * (1 + threshold):
+                found.append(
+                    f"{result['command']} ({result['events']} events): {metric} "
+                    f"{old[metric]:.4g} -> {result[metric]:.4g}"
+                )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", nargs="+", choices=COMMANDS, default=COMMANDS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="keep the Calendar quota rate limiter on (off by default)",
+    )
+    args = parser.parse_args()
+
+    if not args.rate_limit:
+        calendar_limiter.burst = calendar_limiter.tokens = float("inf")
+
+    results = benchmark(args.commands, args.sizes, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "results": results,
+            },
+            file,
+            indent=4,
+        )
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        found = regressions(results, baseline, args.threshold)
+        for line in found:
+            print(f"Regression: {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
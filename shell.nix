@@ -14,6 +14,8 @@ in
           google-api-python-client
           google-auth-httplib2
           google-auth-oauthlib
+          httpx
+          numpy
           python-dateutil
           pytz
         ]))
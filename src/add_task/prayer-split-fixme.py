@@ -1,19 +1,18 @@
 import os.path
+import sys
 from datetime import datetime, timedelta
 
 import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pyplan.auth import calendar_service  # noqa: E402
+from pyplan.batch import BatchWriter  # noqa: E402
+
 # Define task_duration as a static variable (in minutes)
 task_duration = 15  # Set to 15 minutes
 
 # SCOPES for Google Calendar API access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-
 # Predefined Google Calendar colors (1-11) and their human-readable names
 COLORS = {
     "1": "Lavender",
@@ -69,8 +68,8 @@ def get_prayer_times(city="Istanbul", country="Turkey"):
         return None
 
 
-def add_event_to_calendar(service, prayer_name, start_time, end_time, color_id):
-    """Add an event to Google Calendar with color."""
+def add_event_to_calendar(writer, prayer_name, start_time, end_time, color_id):
+    """Queue an event for Google Calendar with color."""
     event = {
         "summary": prayer_name,
         "start": {
@@ -83,16 +82,7 @@ def add_event_to_calendar(service, prayer_name, start_time, end_time, color_id):
         },
         "colorId": color_id,  # Set the color for the event
     }
-
-    try:
-        event_result = (
-            service.events().insert(calendarId="primary", body=event).execute()
-        )
-        print(
-            f"Event created: {event_result['summary']} at {start_time} to {end_time} with color ID: {color_id}"
-        )
-    except HttpError as error:
-        print(f"An error occurred: {error}")
+    writer.insert(event)
 
 
 def get_user_color_scheme():
@@ -123,24 +113,9 @@ def get_user_color_scheme():
 
 def main():
     """Main function to fetch prayer times, create tasks around them, and apply colors."""
-    creds = None
-    if os.path.exists("secrets/cal-token.json"):
-        creds = Credentials.from_authorized_user_file("secrets/cal-token.json", SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "secrets/credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(port=0)
-        with open("secrets/cal-token.json", "w") as token:
-            token.write(creds.to_json())
-
     try:
         # Build Google Calendar service
-        service = build("calendar", "v3", credentials=creds)
+        service = calendar_service()
 
         # Fetch prayer times
         prayer_times = get_prayer_times(city="Istanbul", country="Turkey")
@@ -149,6 +124,7 @@ def main():
         color_scheme = get_user_color_scheme()
 
         # Calculate and add events to calendar with colors
+        writer = BatchWriter(service)
         if prayer_times:
             for prayer_key, prayer_data in prayer_times.items():
                 prayer_name = prayer_data["name"] + " Namazı"
@@ -188,7 +164,16 @@ def main():
 
                 # Add event to Google Calendar with the chosen color
                 add_event_to_calendar(
-                    service, prayer_name, task_start_time, task_end_time, color_id
+                    writer, prayer_name, task_start_time, task_end_time, color_id
+                )
+
+        for result in writer.execute():
+            if result["error"]:
+                print(f"An error occurred: {result['error']}")
+            else:
+                event = result["response"]
+                print(
+                    f"Event created: {event['summary']} at {event['start']['dateTime']} to {event['end']['dateTime']} with color ID: {event.get('colorId')}"
                 )
 
     except HttpError as error:
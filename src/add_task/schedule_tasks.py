@@ -0,0 +1,8 @@
+import os.path
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pyplan.commands.schedule_tasks import main  # noqa: E402
+
+if __name__ == "__main__":
+    main()
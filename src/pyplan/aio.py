@@ -0,0 +1,215 @@
+"""asyncio client for the Calendar API calls made by the scripts.
+
+The requests are built from the same discovery document as the threaded
+service and sent with httpx, which is an optional dependency:
+
+    pip install httpx
+"""
+
+import asyncio
+import json
+from urllib.parse import quote
+
+import httplib2
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+
+from pyplan import batch
+from pyplan.auth import (
+    CALENDAR_SCOPES,
+    CALENDAR_TOKEN_FILE,
+    discovery_document,
+    expires_soon,
+    get_credentials,
+)
+from pyplan.events import MAX_PAGE_SIZE, rfc3339
+from pyplan.executor import MAX_RETRIES, is_retryable, retry_delay, run_budget
+from pyplan.freebusy import forget_busy
+from pyplan.ratelimit import calendar_limiter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+MAX_CONCURRENCY = 20
+
+
+class AsyncCalendar:
+    """Awaitable list, insert, update, patch and delete calls for calendar events.
+
+    At most concurrency requests are in flight at once. Requests share the
+    rate limiter, budget and retry policy of pyplan.executor.
+    Failures are raised as googleapiclient HttpError, like the threaded
+    service. client may be an httpx.AsyncClient to send the requests with.
+    """
+
+    def __init__(
+        self,
+        credentials=None,
+        concurrency=MAX_CONCURRENCY,
+        retries=MAX_RETRIES,
+        client=None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "The asyncio calendar client needs httpx: pip install httpx"
+            )
+
+        document = json.loads(discovery_document("calendar", "v3"))
+        self.base_url = document["rootUrl"] + document["servicePath"]
+        self.methods = document["resources"]["events"]["methods"]
+        self.credentials = credentials or get_credentials(
+            CALENDAR_SCOPES, CALENDAR_TOKEN_FILE
+        )
+        self.retries = retries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.refresh_lock = asyncio.Lock()
+        self.client = client or httpx.AsyncClient()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    async def _token(self):
+        async with self.refresh_lock:
+            if not self.credentials.valid or expires_soon(self.credentials):
+                await asyncio.to_thread(self.credentials.refresh, Request())
+        return self.credentials.token
+
+    async def call(self, method, path_params, params=None, body=None):
+        """Send one events.<method> request and return the decoded response."""
+        spec = self.methods[method]
+        url = self.base_url + spec["path"].format(
+            **{name: quote(value, safe="") for name, value in path_params.items()}
+        )
+        params = {
+            name: value for name, value in (params or {}).items() if value is not None
+        }
+
+        for attempt in range(self.retries + 1):
+            run_budget.spend()
+            async with self.semaphore:
+                await calendar_limiter.acquire_async()
+                response = await self.client.request(
+                    spec["httpMethod"],
+                    url,
+                    params=params,
+                    json=body,
+                    headers={"Authorization": f"Bearer {await self._token()}"},
+                )
+            if response.status_code < 400:
+                break
+
+            error = HttpError(
+                httplib2.Response({"status": response.status_code}),
+                response.content,
+                uri=str(response.url),
+            )
+            if attempt == self.retries or not is_retryable(error):
+                raise error
+            await asyncio.sleep(retry_delay(attempt))
+
+        if not response.content:
+            return None
+        return response.json()
+
+    async def list_events(
+        self,
+        calendar_id,
+        time_min,
+        time_max=None,
+        fields=None,
+        max_results=MAX_PAGE_SIZE,
+    ):
+        """Yield the events overlapping a time range, one page at a time."""
+        params = {
+            "timeMin": rfc3339(time_min),
+            "timeMax": None if time_max is None else rfc3339(time_max),
+            "singleEvents": "true",
+            "orderBy": "startTime",
+            "maxResults": max_results,
+            "fields": None if fields is None else f"nextPageToken,items({fields})",
+        }
+        while True:
+            page = await self.call("list", {"calendarId": calendar_id}, params)
+            for event in page.get("items", []):
+                yield event
+
+            params["pageToken"] = page.get("nextPageToken")
+            if not params["pageToken"]:
+                return
+
+    async def insert_event(self, calendar_id, body):
+        return await self.call("insert", {"calendarId": calendar_id}, body=body)
+
+    async def update_event(self, calendar_id, event_id, body):
+        return await self.call(
+            "update", {"calendarId": calendar_id, "eventId": event_id}, body=body
+        )
+
+    async def patch_event(self, calendar_id, event_id, fields):
+        return await self.call(
+            "patch", {"calendarId": calendar_id, "eventId": event_id}, body=fields
+        )
+
+    async def delete_event(self, calendar_id, event_id):
+        return await self.call(
+            "delete", {"calendarId": calendar_id, "eventId": event_id}
+        )
+
+    async def send_changes(self, calendar_id, changes):
+        """Send planned (op, event_id, body) changes at once; returns the results.
+
+        Results are dicts like BatchWriter's, in the order of changes. As with
+        BatchWriter, --plan mode records the changes instead of sending them,
+        and a calendar written to has its cached busy time dropped.
+        """
+        if batch.recording is not None:
+            for op, event_id, body in changes:
+                batch.recording.record(calendar_id, op, event_id, body)
+            return []
+
+        async def send(op, event_id, body):
+            if op not in ("insert", "update", "patch", "delete"):
+                raise ValueError(f"Unknown operation: {op}")
+            path_params = {"calendarId": calendar_id}
+            if event_id is not None:
+                path_params["eventId"] = event_id
+            result = {"op": op, "event_id": event_id, "response": None, "error": None}
+            try:
+                result["response"] = await self.call(op, path_params, body=body)
+            except HttpError as error:
+                result["error"] = error
+            return result
+
+        results = await asyncio.gather(*(send(*change) for change in changes))
+        if any(result["error"] is None for result in results):
+            forget_busy(calendar_id)
+        return results
+
+
+async def gather_calendars(calendar_ids, task, *args, concurrency=MAX_CONCURRENCY):
+    """Await task(client, calendar_id, *args) for every calendar at once.
+
+    Returns a dict of results by calendar ID; calendars that fail, with an
+    HttpError, a request budget run out or an error of their own, are
+    reported and left out.
+    """
+    async with AsyncCalendar(concurrency=concurrency) as client:
+        results = await asyncio.gather(
+            *(task(client, calendar_id, *args) for calendar_id in calendar_ids),
+            return_exceptions=True,
+        )
+
+    by_calendar = {}
+    for calendar_id, result in zip(calendar_ids, results):
+        if isinstance(result, Exception):
+            print(f"An error occurred on calendar {calendar_id}: {result}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            by_calendar[calendar_id] = result
+    return by_calendar
@@ -0,0 +1,133 @@
+"""Authenticated Google API services shared by every pyplan script."""
+
+import datetime
+import os.path
+import threading
+
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpRequest
+
+from pyplan.executor import CalendarRequest
+from pyplan.paths import secrets_path
+
+# If modifying these scopes, delete the matching token file.
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TASKS_SCOPES = ["https://www.googleapis.com/auth/tasks"]
+
+CREDENTIALS_FILE = secrets_path("credentials.json")
+CALENDAR_TOKEN_FILE = secrets_path("cal-token.json")
+TASKS_TOKEN_FILE = secrets_path("token-tasks.json")
+DISCOVERY_DIR = secrets_path("discovery")
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+
+# Refresh access tokens that expire within this margin instead of waiting for
+# them to lapse mid-run.
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+_credentials = {}
+_lock = threading.Lock()
+# Services are cached per thread since the httplib2 object behind each one is
+# not thread-safe.
+_local = threading.local()
+
+
+def expires_soon(creds):
+    """Whether the access token expires within REFRESH_MARGIN."""
+    if creds.expiry is None:
+        return False
+    expiry = creds.expiry
+    if expiry.tzinfo is None:
+        # google-auth keeps expiry as a naive UTC datetime
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    return expiry - datetime.datetime.now(datetime.timezone.utc) < REFRESH_MARGIN
+
+
+def load_credentials(scopes, token_path):
+    """Load stored credentials, refreshing or logging in only when needed."""
+    creds = None
+    # The token file stores the user's access and refresh tokens, and is
+    # created automatically when the authorization flow completes for the first
+    # time.
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, scopes)
+
+    if creds and creds.valid and not expires_soon(creds):
+        return creds
+
+    if creds and creds.refresh_token:
+        creds.refresh(Request())
+    else:
+        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, scopes)
+        creds = flow.run_local_server(port=0)
+
+    # Save the credentials for the next run
+    with open(token_path, "w") as token:
+        token.write(creds.to_json())
+    return creds
+
+
+def discovery_document(api, version):
+    """Return the discovery document for an API, persisting it locally."""
+    path = os.path.join(DISCOVERY_DIR, f"{api}.{version}.json")
+    if os.path.exists(path):
+        with open(path) as file:
+            return file.read()
+
+    document = get_static_doc(api, version)
+    if document is None:
+        response, content = httplib2.Http().request(
+            DISCOVERY_URL.format(api=api, version=version)
+        )
+        if response.status != 200:
+            raise RuntimeError(
+                f"Could not fetch discovery document for {api} {version}"
+            )
+        document = content.decode("utf-8")
+
+    os.makedirs(DISCOVERY_DIR, exist_ok=True)
+    with open(path, "w") as file:
+        file.write(document)
+    return document
+
+
+def get_credentials(scopes, token_path):
+    """Load credentials once per process and scope set."""
+    key = (token_path, tuple(sorted(scopes)))
+    with _lock:
+        if key not in _credentials:
+            _credentials[key] = load_credentials(scopes, token_path)
+        return _credentials[key]
+
+
+def get_service(api, version, scopes, token_path, request_builder=HttpRequest):
+    """Build an API service once per thread and scope set."""
+    services = _local.__dict__.setdefault("services", {})
+    key = (api, version, tuple(sorted(scopes)))
+    if key not in services:
+        services[key] = build_from_document(
+            discovery_document(api, version),
+            credentials=get_credentials(scopes, token_path),
+            requestBuilder=request_builder,
+        )
+    return services[key]
+
+
+def calendar_service():
+    """Return the authenticated Google Calendar v3 service."""
+    return get_service(
+        "calendar",
+        "v3",
+        CALENDAR_SCOPES,
+        CALENDAR_TOKEN_FILE,
+        request_builder=CalendarRequest,
+    )
+
+
+def tasks_service():
+    """Return the authenticated Google Tasks v1 service."""
+    return get_service("tasks", "v1", TASKS_SCOPES, TASKS_TOKEN_FILE)
@@ -0,0 +1,135 @@
+"""Batched event writes for the Google Calendar API."""
+
+import threading
+import time
+
+from pyplan.executor import MAX_RETRIES, call_with_retry, is_retryable, retry_delay
+from pyplan.freebusy import forget_busy
+
+# The API accepts up to 1000 calls per batch, but Google recommends keeping
+# Calendar batches at 50 or fewer.
+MAX_BATCH_SIZE = 50
+
+# Set by pyplan.planfile.planning() while a script runs in --plan mode
+recording = None
+
+
+class PlanRecorder:
+    """Operations collected from every calendar's BatchWriter in --plan mode."""
+
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, calendar_id, op, event_id, body):
+        with self.lock:
+            self.records.append(
+                {
+                    "calendar_id": calendar_id,
+                    "op": op,
+                    "event_id": event_id,
+                    "body": body,
+                }
+            )
+
+
+class BatchWriter:
+    """Collect inserts, updates and deletes and send them in batch requests.
+
+    Operations are queued with insert(), update(), patch() and delete() and
+    sent when execute() is called. Each operation gets a result dict with its
+    "op", "event_id", "response" and "error" keys, in the order it was queued.
+
+    While a script runs in --plan mode, execute() records the operations in
+    the plan instead of sending them and returns no results.
+    """
+
+    def __init__(self, service, calendar_id="primary", batch_size=MAX_BATCH_SIZE):
+        self.service = service
+        self.calendar_id = calendar_id
+        self.batch_size = batch_size
+        self.pending = []
+        # Each service.events() call builds the resource's methods anew
+        self.events = service.events()
+
+    def insert(self, body):
+        request = self.events.insert(calendarId=self.calendar_id, body=body)
+        self.pending.append(("insert", None, body, request))
+
+    def update(self, event_id, body):
+        request = self.events.update(
+            calendarId=self.calendar_id, eventId=event_id, body=body
+        )
+        self.pending.append(("update", event_id, body, request))
+
+    def patch(self, event_id, fields):
+        request = self.events.patch(
+            calendarId=self.calendar_id, eventId=event_id, body=fields
+        )
+        self.pending.append(("patch", event_id, fields, request))
+
+    def delete(self, event_id):
+        request = self.events.delete(calendarId=self.calendar_id, eventId=event_id)
+        self.pending.append(("delete", event_id, None, request))
+
+    def queue(self, op, event_id=None, body=None):
+        """Queue an operation by name, as found in a plan."""
+        if op == "insert":
+            self.insert(body)
+        elif op == "update":
+            self.update(event_id, body)
+        elif op == "patch":
+            self.patch(event_id, body)
+        elif op == "delete":
+            self.delete(event_id)
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+    def execute(self):
+        """Send all queued operations and return their results.
+
+        Operations that fail with a transient or quota error are sent again
+        in a later batch after a backoff. Once any operation succeeds, the
+        calendar's cached busy time is dropped.
+        """
+        pending, self.pending = self.pending, []
+        if recording is not None:
+            for op, event_id, body, _ in pending:
+                recording.record(self.calendar_id, op, event_id, body)
+            return []
+
+        results = [None] * len(pending)
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            op, event_id, _, _ = pending[index]
+            results[index] = {
+                "op": op,
+                "event_id": event_id,
+                "response": response,
+                "error": exception,
+            }
+
+        queue = list(range(len(pending)))
+        for attempt in range(MAX_RETRIES + 1):
+            for offset in range(0, len(queue), self.batch_size):
+                chunk = queue[offset : offset + self.batch_size]
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index in chunk:
+                    batch.add(pending[index][3], request_id=str(index))
+                # Every call in a batch counts against the quota
+                call_with_retry(batch.execute, cost=len(chunk))
+
+            queue = [
+                index
+                for index in queue
+                if results[index]["error"] is not None
+                and is_retryable(results[index]["error"])
+            ]
+            if not queue or attempt == MAX_RETRIES:
+                break
+            time.sleep(retry_delay(attempt))
+
+        if any(result["error"] is None for result in results):
+            forget_busy(self.calendar_id)
+        return results
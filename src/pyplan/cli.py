@@ -0,0 +1,150 @@
+"""The pyplan command: every script as a subcommand, with flags for all input.
+
+Only the standard library is imported up front. A subcommand's module in
+pyplan.commands, and with it googleapiclient, dateutil and the other heavy
+dependencies, is imported once the subcommand is known, so `pyplan --help`
+and the offline subcommands start quickly.
+
+Each command module exposes make_parser(prog) and run(args), which returns
+the command's results; --json prints those on stdout and sends everything
+the command prints to stderr.
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+
+from pyplan.paths import SECRETS_ENV
+
+
+def pyplan_module(module, make_parser="make_parser", run="run"):
+    """Loader of a command defined in a pyplan module."""
+
+    def load():
+        loaded = importlib.import_module(f"pyplan.{module}")
+        return argparse.Namespace(
+            make_parser=getattr(loaded, make_parser), run=getattr(loaded, run)
+        )
+
+    return load
+
+
+# Subcommand: (loader of a module with make_parser and run, help)
+COMMANDS = {
+    "list": (pyplan_module("commands.upcoming"), "print upcoming calendar events"),
+    "shrink": (
+        pyplan_module("commands.shrink"),
+        "squeeze today's events into the time left before midnight",
+    ),
+    "stopwatch": (
+        pyplan_module("commands.stopwatch"),
+        "time the running event and move the rest of today's to match",
+    ),
+    "restore": (
+        pyplan_module("commands.restore"),
+        "restore the events saved by shrink",
+    ),
+    "snapshots": (
+        pyplan_module("commands.snapshots"),
+        "list the snapshots saved by shrink (offline)",
+    ),
+    "urgent": (
+        pyplan_module("commands.urgent"),
+        "squeeze an urgent task into today's schedule",
+    ),
+    "insert": (
+        pyplan_module("commands.insert"),
+        "insert events at given times and push the ones in their way",
+    ),
+    "replace": (
+        pyplan_module("commands.replace"),
+        "replace days or weeks of events with copies of others",
+    ),
+    "prayer": (pyplan_module("commands.prayer"), "add prayer times to the calendar"),
+    "schedule": (
+        pyplan_module("commands.schedule_tasks"),
+        "schedule open tasks into the free time of the calendar",
+    ),
+    "times": (
+        pyplan_module("commands.times"),
+        "print prayer times without the network (offline)",
+    ),
+    "tasks": (pyplan_module("commands.tasks"), "print the task lists"),
+    "daemon": (pyplan_module("daemon"), "run jobs on cron schedules, kept warm"),
+    "ctl": (
+        pyplan_module("daemon", "control_parser", "control"),
+        "list, run or stop the jobs of a running daemon",
+    ),
+}
+
+
+def load_command(name):
+    """Import a subcommand and build its parser; returns (command, parser).
+
+    command has the make_parser and run functions of its script.
+    """
+    command = COMMANDS[name][0]()
+    parser = command.make_parser(f"pyplan {name}")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print the results as JSON on stdout, and the progress on stderr",
+    )
+    return command, parser
+
+
+def start_run():
+    """Give the next command in this process the whole request budget.
+
+    A process such as the daemon runs many commands, and the budget is per
+    run. Offline commands never import the executor, so it is left alone.
+    """
+    executor = sys.modules.get("pyplan.executor")
+    if executor is not None:
+        executor.run_budget.reset()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pyplan", description="Plan your life in python."
+    )
+    parser.add_argument(
+        "--secrets",
+        metavar="DIR",
+        help=f"directory of the credentials, tokens and databases "
+        f"(default: ${SECRETS_ENV} or ./secrets)",
+    )
+    subcommands = parser.add_subparsers(
+        dest="command", metavar="COMMAND", required=True
+    )
+    for name, (_, help) in COMMANDS.items():
+        # The subcommand's own parser is built once its script is imported
+        subcommands.add_parser(name, help=help, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    # Set before the script is imported, since its paths are read on import
+    if args.secrets:
+        os.environ[SECRETS_ENV] = args.secrets
+
+    command, command_parser = load_command(args.command)
+    command_args = command_parser.parse_args(rest)
+    if command_args.json and getattr(command_args, "plan", None) == "-":
+        command_parser.error("--json and --plan - both write to stdout")
+
+    start_run()
+    if not command_args.json:
+        results = command.run(command_args)
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            results = command.run(command_args)
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False, default=str)
+        print()
+    # The scripts report their errors and return None
+    return 1 if results is None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
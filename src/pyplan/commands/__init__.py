@@ -0,0 +1,4 @@
+"""The pyplan subcommands, one module each with make_parser(prog) and run(args).
+
+The scripts under src/ are thin wrappers that run these modules' main().
+"""
@@ -0,0 +1,243 @@
+import datetime
+import hashlib
+import json
+from bisect import bisect_right
+
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.commands.urgent import COLORS, event_body, utc
+from pyplan.insertion import (
+    Insertion,
+    displace,
+    parse_days,
+    parse_insertion,
+    parse_times,
+)
+from pyplan.model import load_events
+from pyplan.packing import local_timestamp
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import plan_changes, queue_changes
+from pyplan.planfile import apply_plan, planning
+
+DESCRIPTION = (
+    "Insert events at given times on one or more days and push the events "
+    "in their way, in one batched write."
+)
+
+
+def insertion_event_id(insertion, start):
+    """A stable event ID for an insertion at a time, so re-runs add nothing."""
+    key = f"{insertion.summary}/{insertion.duration}/{utc(start).isoformat()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def insertion_body(insertion, start):
+    """Build the request body for one inserted event."""
+    body = event_body(
+        insertion.summary,
+        utc(start),
+        utc(start + insertion.duration),
+        insertion.color_id,
+    )
+    if insertion.color_id is None:
+        del body["colorId"]
+    body["id"] = insertion_event_id(insertion, start)
+    body["extendedProperties"] = {"private": {"pyplan": "insert"}}
+    return body
+
+
+def is_insertion(event):
+    return (event.body or {}).get("extendedProperties", {}).get("private", {}).get(
+        "pyplan"
+    ) == "insert"
+
+
+def insert_events(service, calendar_id, insertions, start_date, days=1, min_duration=0):
+    """Insert events at their times on days days from start_date.
+
+    The whole span is listed once and planned day by day: the events in the
+    way of an insertion move later, along with those they run into, and the
+    moved events are patched in the same batches as the inserts. Events
+    added by an earlier run stay pinned and are not added again. Returns the
+    BatchWriter results.
+    """
+    dates = [start_date + datetime.timedelta(days=offset) for offset in range(days)]
+    day_starts = [local_timestamp(day, datetime.time()) for day in dates]
+    span_end = local_timestamp(dates[-1] + datetime.timedelta(days=1), datetime.time())
+    day_ends = day_starts[1:] + [span_end]
+
+    events = load_events(service, utc(day_starts[0]), utc(span_end), calendar_id)
+    known = {event.id for event in events}
+    by_day = [[] for _ in dates]
+    pinned = [[] for _ in dates]
+    for event in events:
+        if event.all_day:
+            continue
+        position = bisect_right(day_starts, event.start) - 1
+        if position >= 0:
+            (pinned if is_insertion(event) else by_day)[position].append(event)
+
+    moved = []
+    inserts = []
+    for day, day_end, day_events, pins in zip(dates, day_ends, by_day, pinned):
+        new = []
+        for insertion in insertions:
+            if insertion.on(day):
+                for clock in insertion.times:
+                    start = local_timestamp(day, clock)
+                    if insertion_event_id(insertion, start) not in known:
+                        new.append((start, insertion))
+        if not new:
+            continue
+
+        inserts += [insertion_body(insertion, start) for start, insertion in new]
+        spans = sorted(
+            [(event.start, event.end) for event in pins]
+            + [(start, start + insertion.duration) for start, insertion in new]
+        )
+        day_events.sort(key=lambda event: (event.start, event.end))
+        placed = displace(
+            [(event.start, event.end) for event in day_events],
+            spans,
+            day_end,
+            min_duration,
+        )
+        for event, (start, end) in zip(day_events, placed):
+            if (start, end) != (event.start, event.end):
+                event.start, event.end = start, end
+                moved.append(event)
+
+    if not inserts:
+        print("Every insertion is already in the calendar.")
+        return []
+
+    writer = BatchWriter(service, calendar_id)
+    queue_changes(
+        writer,
+        plan_changes(
+            [event.body for event in moved], [event.to_body() for event in moved]
+        ),
+    )
+    for body in inserts:
+        writer.insert(body)
+
+    results = writer.execute()
+    for result in results:
+        if result["error"] is not None and result["error"].resp.status == 409:
+            print("Skipped an event that already exists.")
+        elif result["error"]:
+            print(f"Failed to {result['op']} event: {result['error']}")
+        elif result["op"] == "insert":
+            event = result["response"]
+            print(f"Inserted: {event['summary']} at {event['start']['dateTime']}")
+    print(f"Moved {len(moved)} events for {len(inserts)} insertions.")
+    return results
+
+
+def load_insertions(path, color_id=None):
+    """Insertions from a JSON file of objects with summary, minutes, times
+    and optional days and color keys."""
+    with open(path, encoding="utf-8") as file:
+        items = json.load(file)
+    insertions = []
+    for item in items:
+        weekdays, dates = parse_days(item["days"]) if item.get("days") else (None, None)
+        insertions.append(
+            Insertion(
+                item["summary"],
+                int(item["minutes"]) * 60,
+                parse_times(item["times"]),
+                weekdays,
+                dates,
+                item.get("color", color_id),
+            )
+        )
+    return insertions
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "-i",
+        "--insert",
+        dest="insertions",
+        action="append",
+        nargs="+",
+        default=[],
+        metavar="FIELD",
+        help="SUMMARY MINUTES TIMES [DAYS], e.g. Stretch 20 10:00,12:00 mon-fri; "
+        "may be repeated. DAYS are weekdays or YYYY-MM-DD dates (default: every day)",
+    )
+    parser.add_argument(
+        "--file",
+        help="JSON list of insertions with summary, minutes, times and optional "
+        "days and color keys",
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.date.fromisoformat,
+        help="first day, YYYY-MM-DD (default: today)",
+    )
+    span = parser.add_mutually_exclusive_group()
+    span.add_argument("--days", type=int, default=1, help="days to cover (default: 1)")
+    span.add_argument(
+        "--week",
+        dest="days",
+        action="store_const",
+        const=7,
+        help="cover a whole week, same as --days 7",
+    )
+    parser.add_argument(
+        "--color", choices=sorted(COLORS, key=int), help="color ID of the new events"
+    )
+    parser.add_argument(
+        "--min-duration",
+        type=int,
+        default=0,
+        metavar="MINUTES",
+        help="shortest a moved event may be shrunk to (default: 0)",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        insertions = [parse_insertion(fields, args.color) for fields in args.insertions]
+        if args.file:
+            insertions += load_insertions(args.file, args.color)
+    except (KeyError, ValueError) as error:
+        print(f"Invalid insertion: {error}")
+        return None
+    if not insertions:
+        print("Nothing to insert; give --insert or --file.")
+        return {}
+    if args.days < 1:
+        print("--days must be at least 1.")
+        return None
+
+    try:
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                insert_events,
+                insertions,
+                args.start or datetime.date.today(),
+                args.days,
+                args.min_duration * 60,
+                max_workers=args.workers,
+            )
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
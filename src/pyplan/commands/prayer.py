@@ -0,0 +1,419 @@
+import hashlib
+from datetime import date, datetime, timedelta
+
+import pytz
+import requests
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.events import SUMMARY_FIELDS
+from pyplan.freebusy import busy_spans
+from pyplan.intervals import IntervalIndex
+from pyplan.model import load_events
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.planfile import apply_plan, planning
+from pyplan.prayertimes import (
+    DEFAULT_LOCATION,
+    DEFAULT_METHOD,
+    METHODS,
+    PrayerTimeCache,
+    cached_timings,
+    is_coordinates,
+    location_name,
+    parse_location,
+)
+
+# Configuration constants
+TASK_DURATION_MINUTES = 15  # Event duration in minutes
+DEFAULT_TIMEZONE = "Europe/Istanbul"
+API_BASE_URL = "http://api.aladhan.com/v1/timingsByCity"
+API_COORDINATES_URL = "http://api.aladhan.com/v1/timings"
+DESCRIPTION = "Add prayer times to the calendar."
+
+# Predefined Google Calendar color names mapped to color IDs
+COLORS = {
+    "Lavender": "1",
+    "Sage": "2",
+    "Grape": "3",
+    "Flamingo": "4",
+    "Banana": "5",
+    "Tangerine": "6",
+    "Peacock": "7",
+    "Graphite": "8",
+    "Blueberry": "9",
+    "Basil": "10",
+    "Tomato": "11",
+}
+
+# Prayer color scheme mapped by prayer names, including Sunrise
+PRAYER_COLOR_SCHEME = {
+    "Sabah": COLORS["Lavender"],  # Using "Güneş" for Sunrise
+    "Öğle": COLORS["Sage"],
+    "İkindi": COLORS["Grape"],
+    "Akşam": COLORS["Flamingo"],
+    "Yatsı": COLORS["Banana"],
+}
+
+# Map for English to Turkish prayer names, including Sunrise
+TURKISH_PRAYER_NAMES = {
+    "Sunrise": "Sabah",
+    "Dhuhr": "Öğle",
+    "Asr": "İkindi",
+    "Maghrib": "Akşam",
+    "Isha": "Yatsı",
+}
+
+
+def fetch_prayer_times(location, day, method=DEFAULT_METHOD):
+    """Fetch a date's prayer timings and the time zone they are in from Aladhan."""
+    if is_coordinates(location):
+        latitude, longitude, timezone = location
+        url = f"{API_COORDINATES_URL}/{day:%d-%m-%Y}"
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "timezonestring": timezone,
+            "method": method,
+        }
+    else:
+        city, country = location
+        url = f"{API_BASE_URL}/{day:%d-%m-%Y}"
+        params = {"city": city, "country": country, "method": method}
+    try:
+        response = requests.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()["data"]
+        return data["timings"], data["meta"]["timezone"]
+
+    except requests.RequestException as e:
+        print(f"Error fetching prayer times: {e}")
+        return None
+
+
+def get_prayer_times(
+    location=DEFAULT_LOCATION, day=None, method=DEFAULT_METHOD, offline=False
+):
+    """Prayer times for a location and date, and the time zone they are in.
+
+    Timings come from the local cache when present, then from the Aladhan
+    API, and otherwise are calculated locally for cities in CITIES and for
+    coordinates. With offline the API is never asked. Whatever is found is
+    cached. Returns
+    (None, None) when nothing is.
+    """
+    day = day or datetime.now().date()
+    cache = PrayerTimeCache()
+    try:
+        timings, timezone = cached_timings(
+            cache,
+            location,
+            day,
+            method,
+            fetch=None if offline else fetch_prayer_times,
+        )
+    finally:
+        cache.close()
+
+    if not timings:
+        return None, None
+    return {
+        prayer: {"name": TURKISH_PRAYER_NAMES[prayer], "time": time}
+        for prayer, time in timings.items()
+        if prayer in TURKISH_PRAYER_NAMES
+    }, timezone
+
+
+def prayer_event_body(prayer_name, start_time, end_time, color_id, timezone=None):
+    """Build the request body for a prayer event."""
+    timezone = timezone or DEFAULT_TIMEZONE
+    return {
+        "summary": prayer_name,
+        "start": {"dateTime": start_time, "timeZone": timezone},
+        "end": {"dateTime": end_time, "timeZone": timezone},
+        "colorId": color_id,
+    }
+
+
+def prayer_event_id(location, day, prayer_key):
+    """A stable event ID for one prayer, so re-runs can tell it was added.
+
+    Hex digits are valid in Calendar event IDs, which use base32hex.
+    """
+    place = "/".join(str(part) for part in location)
+    key = f"{place}/{day.isoformat()}/{prayer_key}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def prayer_slot(day, prayer_key, prayer_times, tz):
+    """Start and end of the event for one prayer, as aware datetimes."""
+    prayer_time = datetime.strptime(prayer_times[prayer_key]["time"], "%H:%M").time()
+
+    # Calculate start and end times for the event
+    task_start = datetime.combine(day, prayer_time) - timedelta(
+        minutes=TASK_DURATION_MINUTES // 3
+    )
+
+    if prayer_key == "Sunrise":
+        # Special case for Fajr (Sabah) to align it just before sunrise
+        task_start = datetime.combine(day, prayer_time) - timedelta(
+            minutes=TASK_DURATION_MINUTES * 2
+        )
+
+    task_end = task_start + timedelta(minutes=TASK_DURATION_MINUTES)
+    return tz.localize(task_start), tz.localize(task_end)
+
+
+def checked_range(start_date, end_date=None):
+    """UTC (time_min, time_max) to check the prayers of start_date to end_date in.
+
+    The range is widened by a day on each side so that prayers in time zones
+    ahead of or behind UTC are still checked against every event.
+    """
+    end_date = end_date or start_date
+    time_min = datetime.combine(start_date - timedelta(days=1), datetime.min.time())
+    time_max = datetime.combine(end_date + timedelta(days=2), datetime.min.time())
+    return time_min, time_max
+
+
+def fetch_existing_events(service, start_date, end_date=None, calendar_id="primary"):
+    """Fetch existing events from start_date through end_date from Google Calendar."""
+    time_min, time_max = checked_range(start_date, end_date)
+
+    try:
+        return load_events(
+            service,
+            time_min.isoformat() + "Z",
+            time_max.isoformat() + "Z",
+            calendar_id,
+            fields=SUMMARY_FIELDS,
+            keep_body=False,
+        )
+
+    except HttpError as error:
+        print(f"Error fetching existing events: {error}")
+        return []
+
+
+def schedule_prayer_days(
+    service, schedule, calendar_id="primary", busy_calendars=(), freebusy=False
+):
+    """Add prayer events for many days and locations in one pass.
+
+    schedule holds (location, date, prayer_times, timezone) entries, the
+    prayer times being local to timezone. The calendar is
+    listed once for the whole span, collisions are checked against one
+    index, and prayers whose events already exist are skipped. Returns the
+    BatchWriter results of the inserts sent.
+
+    Prayers are also checked against the busy time of busy_calendars, all
+    asked for in one free/busy query. With freebusy the calendar itself is
+    checked that way too instead of being listed, and prayers added before
+    are only told apart when their inserts fail as duplicates.
+    """
+    if not schedule:
+        return []
+    days = sorted(day for _, day, _, _ in schedule)
+    busy_calendars = [other for other in busy_calendars if other != calendar_id]
+    if freebusy:
+        existing = []
+        busy_calendars.insert(0, calendar_id)
+    else:
+        existing = fetch_existing_events(service, days[0], days[-1], calendar_id)
+    existing_ids = {event.id for event in existing}
+    existing_events = IntervalIndex.from_events(existing)
+    busy = IntervalIndex()
+    if busy_calendars:
+        busy = IntervalIndex(
+            busy_spans(service, busy_calendars, *checked_range(days[0], days[-1]))
+        )
+    several_locations = len({location for location, _, _, _ in schedule}) > 1
+
+    writer = BatchWriter(service, calendar_id)
+    skipped = 0
+    # (prayer_name, start, end) of each insert, in the order queued
+    queued = []
+    for location, day, prayer_times, timezone in schedule:
+        tz = pytz.timezone(timezone)
+
+        for prayer_key, prayer_data in prayer_times.items():
+            event_id = prayer_event_id(location, day, prayer_key)
+            if event_id in existing_ids:
+                skipped += 1
+                continue
+
+            prayer_name = f"{prayer_data['name']} Namazı"
+            if several_locations:
+                prayer_name += f" ({location_name(location)})"
+            task_start, task_end = prayer_slot(day, prayer_key, prayer_times, tz)
+
+            # Fetch the color ID for the event
+            color_id = PRAYER_COLOR_SCHEME.get(
+                prayer_data["name"], COLORS["Lavender"]
+            )  # Default to Lavender if not found
+
+            # Check for collisions with existing events
+            for event in existing_events.overlapping(task_start, task_end):
+                print(
+                    f"Event '{event.summary}' is colliding with prayer '{prayer_name}'"
+                )
+
+            # Queue the event for Google Calendar
+            body = prayer_event_body(
+                prayer_name,
+                task_start.isoformat(),
+                task_end.isoformat(),
+                color_id,
+                timezone,
+            )
+            body["id"] = event_id
+            body["extendedProperties"] = {
+                "private": {
+                    "pyplan": "prayer",
+                    "location": ", ".join(str(part) for part in location),
+                }
+            }
+            writer.insert(body)
+            queued.append((prayer_name, task_start, task_end))
+
+    if skipped:
+        print(f"Skipped {skipped} prayer events that already exist.")
+
+    # Add all prayer events in batches
+    results = writer.execute()
+    for result in results:
+        error = result["error"]
+        if error is not None and error.resp.status == 409:
+            # Added by an earlier run outside the listed range, or deleted since
+            print("Skipped a prayer event that already exists.")
+        elif error:
+            print(f"Error adding event to calendar: {error}")
+        else:
+            event = result["response"]
+            print(
+                f"Created event: {event['summary']} from {event['start']['dateTime']} to {event['end']['dateTime']} with color ID: {event.get('colorId')}"
+            )
+
+    if len(busy):
+        # Checked once the inserts are done, so that a prayer added by an
+        # earlier run is not reported as colliding with itself
+        added = queued
+        if results:
+            added = [
+                prayer
+                for prayer, result in zip(queued, results)
+                if result["error"] is None
+            ]
+        for prayer_name, task_start, task_end in added:
+            for other in dict.fromkeys(busy.overlapping(task_start, task_end)):
+                print(
+                    f"Busy time on calendar {other} is colliding with prayer "
+                    f"'{prayer_name}'"
+                )
+    return results
+
+
+def schedule_prayer_events(service, prayer_times, calendar_id="primary", day=None):
+    """Create and add one day's prayer events to the calendar with collision detection."""
+    day = day or datetime.now().date()
+    return schedule_prayer_days(
+        service, [(DEFAULT_LOCATION, day, prayer_times, DEFAULT_TIMEZONE)], calendar_id
+    )
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "-l",
+        "--location",
+        dest="locations",
+        action="append",
+        type=parse_location,
+        help="CITY,COUNTRY or LAT,LON,TZ to add prayers for, may be repeated "
+        "(default: Istanbul,Turkey)",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        help="first date to schedule, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--days", type=int, default=1, help="number of days to schedule (default: 1)"
+    )
+    parser.add_argument(
+        "--method",
+        type=int,
+        default=DEFAULT_METHOD,
+        choices=sorted(METHODS),
+        help=f"Aladhan calculation method (default: {DEFAULT_METHOD})",
+    )
+    parser.add_argument(
+        "--busy-calendar",
+        dest="busy_calendars",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="also check prayers against the busy time of this calendar, "
+        "may be repeated",
+    )
+    parser.add_argument(
+        "--freebusy",
+        action="store_true",
+        help="check the calendar's free/busy time instead of listing its events",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use cached or locally calculated times, never the API",
+    )
+    return parser
+
+
+def run(args):
+    """Fetch prayer times and add their events; returns results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        # Fetch the prayer times of every location and day
+        start = args.start or datetime.now().date()
+        schedule = []
+        for location in args.locations or [DEFAULT_LOCATION]:
+            for offset in range(args.days):
+                day = start + timedelta(days=offset)
+                prayer_times, timezone = get_prayer_times(
+                    location, day=day, method=args.method, offline=args.offline
+                )
+                if prayer_times:
+                    schedule.append((location, day, prayer_times, timezone))
+                else:
+                    print(
+                        f"No prayer times available for {location_name(location)} "
+                        f"on {day}."
+                    )
+        if not schedule:
+            return {}
+
+        # Schedule prayer events with colors
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                lambda service, calendar_id: schedule_prayer_days(
+                    service,
+                    schedule,
+                    calendar_id,
+                    args.busy_calendars,
+                    args.freebusy,
+                ),
+                max_workers=args.workers,
+            )
+
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import datetime
+
+from dateutil import parser
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import plan_changes, queue_changes
+from pyplan.planfile import apply_plan, planning
+from pyplan.store import event_timestamp, list_events
+
+DESCRIPTION = "Replace days or weeks of events with copies of another day or week."
+
+
+def day_start(day):
+    """Midnight UTC at the start of a date."""
+    return datetime.datetime.combine(day, datetime.time.min, datetime.timezone.utc)
+
+
+def get_events_for_date(service, date, calendar_id="primary"):
+    """Fetch events for a specific date."""
+    return get_events_between(service, date, 1, calendar_id)
+
+
+def get_events_between(service, start_date, days, calendar_id="primary"):
+    """Fetch the events of days whole days from start_date in one listing."""
+    return list_events(
+        service,
+        day_start(start_date).isoformat(),
+        day_start(start_date + datetime.timedelta(days=days)).isoformat(),
+        calendar_id,
+    )
+
+
+def events_in(events, start_date, days):
+    """The events overlapping days whole days from start_date."""
+    low = day_start(start_date).timestamp()
+    high = day_start(start_date + datetime.timedelta(days=days)).timestamp()
+    return [
+        event
+        for event in events
+        if event_timestamp(event["end"]) > low
+        and event_timestamp(event["start"]) < high
+    ]
+
+
+def copy_event(event, source_date, target_date):
+    """Build a copy of an event moved from the source to the target date, keeping its time frame and color."""
+    # All-day events only have a "date"
+    time_key = "dateTime" if "dateTime" in event["start"] else "date"
+    original_start = parser.isoparse(event["start"][time_key])
+    original_end = parser.isoparse(event["end"][time_key])
+
+    # Shift by the days between the two dates rather than from the event's own
+    # local start date, which can differ from the listed day across timezones
+    delta_days = (target_date - source_date).days
+
+    # Apply the delta to get the new start and end times
+    new_start = original_start + datetime.timedelta(days=delta_days)
+    new_end = original_end + datetime.timedelta(days=delta_days)
+    if time_key == "date":
+        new_start, new_end = new_start.date(), new_end.date()
+
+    return {
+        "summary": event.get("summary"),
+        "location": event.get("location"),
+        "description": event.get("description"),
+        "start": {time_key: new_start.isoformat()},
+        "end": {time_key: new_end.isoformat()},
+        "attendees": event.get("attendees"),
+        "recurrence": event.get("recurrence"),
+        "reminders": event.get("reminders"),
+        "colorId": event.get("colorId"),  # Copy the event color
+    }
+
+
+def parse_date_input(date_input):
+    """Parse user input to handle natural phrases and dates."""
+    today = datetime.datetime.now().date()
+    if date_input.lower() in ["today", "t", "now"]:
+        return today
+    elif date_input.lower() in ["tomorrow", "tmr"]:
+        return today + datetime.timedelta(days=1)
+    elif date_input.lower() in ["yesterday", "y"]:
+        return today - datetime.timedelta(days=1)
+    elif not date_input:
+        # If the input is empty, default to today
+        return today
+    else:
+        try:
+            # Attempt to parse the date input
+            return parser.parse(date_input).date()
+        except ValueError:
+            print("Invalid date format or phrase. Please try again.")
+            return None
+
+
+def replace_range(
+    service, calendar_id, copy_from_date, target_dates, days=1, delete=True
+):
+    """Replace the events of each target span with copies of the source span.
+
+    Spans are days whole days long and start at copy_from_date and at each
+    of target_dates. Everything is listed once, the copies for every target
+    are planned together, and the writes go out in batches. Instances of a
+    recurring event that already match a copy are kept rather than deleted
+    and copied again. With delete False, events already in the targets are
+    kept. Returns the BatchWriter results of the writes sent.
+    """
+    overlapping = [
+        target for target in target_dates if abs((target - copy_from_date).days) < days
+    ]
+    if overlapping:
+        print(f"Skipping targets that overlap the source days: {overlapping}")
+        target_dates = [target for target in target_dates if target not in overlapping]
+    if not target_dates:
+        return []
+
+    # One listing covering the source and every target
+    first = min(copy_from_date, *target_dates)
+    last = max(copy_from_date, *target_dates) + datetime.timedelta(days=days)
+    events = get_events_between(service, first, (last - first).days, calendar_id)
+
+    events_to_copy = events_in(events, copy_from_date, days)
+    if not events_to_copy:
+        print("No events found on the specified date to copy.")
+        return []
+
+    # Only delete target events that have no identical copy, and only insert
+    # the copies that are missing. Source events running into an adjacent
+    # target are never deleted.
+    source_ids = {event["id"] for event in events_to_copy}
+    existing = {
+        event["id"]: event
+        for target in target_dates
+        for event in events_in(events, target, days)
+        if event["id"] not in source_ids
+    }
+    changes = plan_changes(
+        list(existing.values()),
+        [
+            copy_event(event, copy_from_date, target)
+            for target in target_dates
+            for event in events_to_copy
+        ],
+        delete_missing=delete,
+    )
+    if not changes:
+        print("The target days already match the source.")
+        return []
+
+    writer = BatchWriter(service, calendar_id)
+    queue_changes(writer, changes)
+    results = writer.execute()
+    for result in results:
+        if result["op"] == "delete":
+            if result["error"]:
+                print(f"Failed to delete event {result['event_id']}: {result['error']}")
+            else:
+                summary = existing[result["event_id"]].get("summary", "No Title")
+                print(f"Deleted event: {summary}")
+        elif result["error"]:
+            print(f"An error occurred while copying events: {result['error']}")
+        else:
+            event = result["response"]
+            start = event["start"].get("dateTime", event["start"].get("date"))
+            print(f"Copied event: {event.get('summary')} to {start[:10]}")
+    return results
+
+
+def replace_day(service, calendar_id, copy_from_date, copy_to_date, delete=True):
+    """Replace the target day's events on one calendar with the source day's.
+
+    With delete False the source day's events are only copied, and events
+    already on the target day are kept.
+    """
+    return replace_range(
+        service, calendar_id, copy_from_date, [copy_to_date], 1, delete
+    )
+
+
+def date_argument(value):
+    """argparse type for the dates and phrases parse_date_input() accepts."""
+    parsed = parse_date_input(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r}")
+    return parsed
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "--no-delete",
+        dest="delete",
+        action="store_false",
+        help="only copy events, keeping the ones already on the target days",
+    )
+    parser.add_argument(
+        "--from",
+        dest="copy_from",
+        type=date_argument,
+        help="first source date; without it the dates are asked for",
+    )
+    parser.add_argument(
+        "--to",
+        dest="copy_to",
+        type=date_argument,
+        help="first target date (default: today)",
+    )
+    span = parser.add_mutually_exclusive_group()
+    span.add_argument(
+        "--days", type=int, default=1, help="days to copy at once (default: 1)"
+    )
+    span.add_argument(
+        "--week",
+        dest="days",
+        action="store_const",
+        const=7,
+        help="copy a whole week, same as --days 7",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="consecutive target spans to fill, e.g. 13 weeks (default: 1)",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        if args.copy_from is not None:
+            copy_from_date = args.copy_from
+            copy_to_date = args.copy_to or parse_date_input("today")
+        else:
+            # Get user input for the date to copy from
+            copy_from_date_input = input(
+                "Enter the date to copy events from (e.g., '2024-09-01', 'tomorrow', or 'yesterday'): "
+            )
+
+            # Parse the user input into a datetime object
+            copy_from_date = parse_date_input(copy_from_date_input)
+            if copy_from_date is None:
+                return
+
+            # Get user input for the target date (defaulting to today if blank)
+            copy_to_date_input = input(
+                "Enter the target date to copy events to (or press Enter to copy to today): "
+            )
+            copy_to_date = parse_date_input(copy_to_date_input)
+            if copy_to_date is None:
+                return
+
+        target_dates = [
+            copy_to_date + datetime.timedelta(days=args.days * index)
+            for index in range(args.repeat)
+        ]
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                replace_range,
+                copy_from_date,
+                target_dates,
+                args.days,
+                args.delete,
+                max_workers=args.workers,
+            )
+
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import datetime
+
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.commands.snapshots import list_snapshots
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import plan_changes, queue_changes
+from pyplan.planfile import apply_plan, planning
+from pyplan.snapshots import SnapshotStore
+from pyplan.store import list_events
+
+DESCRIPTION = "Restore the events saved by shrink."
+
+
+def load_original_event_data(calendar_id="primary", snapshot_id=None, day=None):
+    """Load a snapshot of a calendar: the given one, or the first of a day.
+
+    The day defaults to that of the calendar's latest snapshot.
+
+    Returns (day, events), with no events when nothing was found.
+    """
+    store = SnapshotStore()
+    try:
+        if snapshot_id is None:
+            snapshot_id = store.find(calendar_id, day)
+        if snapshot_id is None and day is None:
+            # Snapshots written before the snapshot store existed
+            snapshot_id = store.import_legacy(calendar_id)
+        snapshot = None if snapshot_id is None else store.get(snapshot_id)
+    finally:
+        store.close()
+
+    if snapshot is None:
+        print("No original events snapshot found.")
+        return day, []
+    if snapshot[0] != calendar_id:
+        print(f"Snapshot {snapshot_id} belongs to calendar {snapshot[0]}.")
+        return day, []
+    return snapshot[1], snapshot[2]
+
+
+def restore_calendar(service, calendar_id, snapshot_id=None, day=None):
+    """Write a snapshot's events back, skipping those that still match it.
+
+    Returns the BatchWriter results of the writes sent.
+    """
+    day, original_events = load_original_event_data(calendar_id, snapshot_id, day)
+
+    if not original_events:
+        print("No original events found to restore.")
+        return []
+
+    day_start = datetime.datetime.combine(day, datetime.time.min, datetime.UTC)
+    current = list_events(
+        service,
+        day_start.isoformat(),
+        (day_start + datetime.timedelta(days=1)).isoformat(),
+        calendar_id,
+    )
+    current_ids = {event["id"] for event in current}
+
+    writer = BatchWriter(service, calendar_id)
+    # Patch the events still on that day with the fields that differ
+    queue_changes(
+        writer,
+        plan_changes(
+            current,
+            [event for event in original_events if event["id"] in current_ids],
+        ),
+    )
+    # Events that have left the day get their full snapshot back
+    for original_event in original_events:
+        if original_event["id"] not in current_ids:
+            restored_event = dict(original_event)
+            del restored_event["id"]
+            writer.update(original_event["id"], restored_event)
+
+    if not writer.pending:
+        print("All events already match the snapshot.")
+        return []
+
+    results = writer.execute()
+    for result in results:
+        if result["error"]:
+            print(f"Failed to restore event {result['event_id']}: {result['error']}")
+        else:
+            print(f"Event restored: {result['response'].get('htmlLink')}")
+    return results
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "--snapshot",
+        type=int,
+        help="snapshot ID to restore (default: the first of the day)",
+    )
+    parser.add_argument(
+        "--day",
+        type=datetime.date.fromisoformat,
+        help="restore the first snapshot of this day, YYYY-MM-DD "
+        "(default: the day of the latest snapshot)",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the stored snapshots and exit"
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.list:
+        return list_snapshots(args.calendars)
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                restore_calendar,
+                args.snapshot,
+                args.day,
+                max_workers=args.workers,
+            )
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+
+from googleapiclient.errors import HttpError
+
+from pyplan.auth import tasks_service
+from pyplan.batch import BatchWriter
+from pyplan.events import rfc3339
+from pyplan.intervals import IntervalIndex
+from pyplan.model import load_events
+from pyplan.packing import (
+    DEFAULT_DURATION,
+    free_gaps,
+    pack,
+    task_work,
+    working_windows,
+)
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.planfile import apply_plan, planning
+from pyplan.taskstore import TaskStore
+
+DESCRIPTION = "Schedule open Google Tasks into the free time of the calendar."
+TASK_COLOR_ID = "9"  # Blueberry
+
+
+def task_key(task):
+    return f"{task['tasklist']}/{task['id']}"
+
+
+def task_event_id(task, day):
+    """A stable event ID for a task scheduled on a day.
+
+    A task left undone gets a new event on a later day, while re-runs on the
+    same day recognise the one already added.
+    """
+    key = f"{task_key(task)}/{day.isoformat()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def task_event_body(work, start, end, late=False):
+    """Build the request body for a task's event."""
+    task = work.item
+    body = {
+        "id": task_event_id(task, utc(start).date()),
+        "summary": work.summary + (" (late)" if late else ""),
+        "start": {"dateTime": rfc3339(utc(start)), "timeZone": "UTC"},
+        "end": {"dateTime": rfc3339(utc(end)), "timeZone": "UTC"},
+        "colorId": TASK_COLOR_ID,
+        "extendedProperties": {
+            "private": {"pyplan": "task", "pyplanTask": task_key(task)}
+        },
+    }
+    if task.get("notes"):
+        body["description"] = task["notes"]
+    return body
+
+
+def utc(timestamp):
+    """Epoch seconds as an aware UTC datetime."""
+    return datetime.datetime.fromtimestamp(timestamp, datetime.UTC)
+
+
+def schedule_tasks(
+    service,
+    calendar_id,
+    tasks,
+    start_date,
+    days=1,
+    day_start=datetime.time(9),
+    day_end=datetime.time(18),
+    default_duration=DEFAULT_DURATION,
+    buffer=0,
+    allow_late=True,
+):
+    """Place open tasks in the free working hours of a calendar.
+
+    The span is listed once, tasks that already have an event in it are
+    skipped, and the events go out as batched inserts. Returns the
+    BatchWriter results.
+    """
+    now = datetime.datetime.now(datetime.UTC)
+    windows = list(working_windows(start_date, days, day_start, day_end))
+    if not windows:
+        return []
+    events = load_events(service, utc(windows[0][0]), utc(windows[-1][1]), calendar_id)
+
+    scheduled = {
+        (event.body or {})
+        .get("extendedProperties", {})
+        .get("private", {})
+        .get("pyplanTask")
+        for event in events
+    }
+    works = [
+        task_work(task, day_end, default_duration)
+        for task in tasks
+        if task_key(task) not in scheduled
+    ]
+    if not works:
+        print("Every open task is already scheduled.")
+        return []
+
+    gaps = free_gaps(IntervalIndex.from_events(events), windows, not_before=now)
+    placements, unplaced = pack(works, gaps, buffer, allow_late)
+    for work in unplaced:
+        print(f"No room for '{work.summary}' ({work.duration // 60} min)")
+    if not placements:
+        return []
+
+    writer = BatchWriter(service, calendar_id)
+    for work, start, end, late in placements:
+        writer.insert(task_event_body(work, start, end, late))
+
+    results = writer.execute()
+    for result in results:
+        error = result["error"]
+        if error is not None and error.resp.status == 409:
+            print("Skipped a task event that already exists.")
+        elif error:
+            print(f"Error adding task to calendar: {error}")
+        else:
+            event = result["response"]
+            print(f"Scheduled: {event['summary']} at {event['start']['dateTime']}")
+    return results
+
+
+def clock_argument(value):
+    return datetime.time.fromisoformat(value)
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "-l",
+        "--list",
+        dest="lists",
+        action="append",
+        help="task list ID to schedule from, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.date.fromisoformat,
+        help="first day to fill, YYYY-MM-DD (default: today)",
+    )
+    span = parser.add_mutually_exclusive_group()
+    span.add_argument("--days", type=int, default=1, help="days to fill (default: 1)")
+    span.add_argument(
+        "--week",
+        dest="days",
+        action="store_const",
+        const=7,
+        help="fill a whole week, same as --days 7",
+    )
+    parser.add_argument(
+        "--day-start",
+        type=clock_argument,
+        default=datetime.time(9),
+        help="start of the working hours, HH:MM local time (default: 09:00)",
+    )
+    parser.add_argument(
+        "--day-end",
+        type=clock_argument,
+        default=datetime.time(18),
+        help="end of the working hours, HH:MM local time (default: 18:00)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=int,
+        default=DEFAULT_DURATION // 60,
+        metavar="MINUTES",
+        help="duration of tasks without a [45m] marker "
+        f"(default: {DEFAULT_DURATION // 60})",
+    )
+    parser.add_argument(
+        "--buffer",
+        type=int,
+        default=0,
+        metavar="MINUTES",
+        help="free minutes to keep after each task (default: 0)",
+    )
+    parser.add_argument(
+        "--no-late",
+        dest="allow_late",
+        action="store_false",
+        help="leave out tasks that cannot be done by their due date",
+    )
+    parser.add_argument(
+        "--offline-tasks",
+        action="store_true",
+        help="read the tasks mirror without syncing it first",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        store = TaskStore(None if args.offline_tasks else tasks_service())
+        try:
+            if not args.offline_tasks:
+                store.sync()
+            tasks = store.open_tasks(args.lists)
+        finally:
+            store.close()
+        if not tasks:
+            print("No open tasks found.")
+            return {}
+
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                schedule_tasks,
+                tasks,
+                args.start or datetime.date.today(),
+                args.days,
+                args.day_start,
+                args.day_end,
+                args.duration * 60,
+                args.buffer * 60,
+                args.allow_late,
+                max_workers=args.workers,
+            )
+
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
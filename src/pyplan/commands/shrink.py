@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+
+from pyplan import batch
+from pyplan.aio import gather_calendars
+from pyplan.batch import BatchWriter
+from pyplan.model import Event, load_events
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import plan_changes, queue_changes
+from pyplan.planfile import apply_plan, planning
+from pyplan.rescale import squeeze
+from pyplan.snapshots import SnapshotStore
+
+DESCRIPTION = "Squeeze today's events into the time left before midnight."
+
+
+def save_original_event_data(events, calendar_id="primary", day=None):
+    """Snapshot the events before they are changed, for restore.py.
+
+    In --plan mode the snapshot is recorded in the plan and taken when the
+    plan is applied, so a dry run saves nothing.
+    """
+    day = day or datetime.now(timezone.utc).date()
+    if batch.recording is not None:
+        batch.recording.record(
+            calendar_id, "snapshot", None, {"day": day.isoformat(), "events": events}
+        )
+        return None
+    store = SnapshotStore()
+    try:
+        return store.save(calendar_id, day, events)
+    finally:
+        store.close()
+
+
+def today():
+    """Now, and the start and end of today as RFC 3339 strings, all in UTC."""
+    now = datetime.now(timezone.utc)
+    today_start = datetime.combine(now, datetime.min.time()).isoformat() + "Z"
+    today_end = datetime.combine(now, datetime.max.time()).isoformat() + "Z"
+    return now, today_start, today_end
+
+
+def plan_shrink(events, calendar_id, now):
+    """Plan the patches that squeeze today's events, and snapshot them.
+
+    The snapshot is only taken when something moves. Returns the planned
+    changes for queue_changes(), empty when there is nothing to move.
+    """
+    # All-day events have no times to squeeze
+    events = [event for event in events if not event.all_day]
+
+    if not events:
+        print("No upcoming events found.")
+        return []
+
+    original_total_time = sum(event.duration for event in events)
+    if original_total_time <= 0:
+        return []
+
+    midnight = datetime.combine(
+        now + timedelta(days=1), datetime.min.time(), timezone.utc
+    )
+    new_starts, new_ends = squeeze(
+        [event.start for event in events],
+        [event.end for event in events],
+        now.timestamp(),
+        midnight.timestamp(),
+    )
+
+    for event, new_start, new_end in zip(events, new_starts, new_ends):
+        event.start, event.end = float(new_start), float(new_end)
+
+    # Only patch the events whose times actually moved
+    changes = plan_changes(
+        [event.body for event in events], [event.to_body() for event in events]
+    )
+    if not changes:
+        print("All events are already in place.")
+        return changes
+
+    # Save original event data
+    save_original_event_data([event.body for event in events], calendar_id, now.date())
+    return changes
+
+
+def report_updates(results):
+    for result in results:
+        if result["error"]:
+            print(f"Failed to update event {result['event_id']}: {result['error']}")
+        else:
+            print(f"Event updated: {result['response'].get('htmlLink')}")
+
+
+def shrink_calendar(service, calendar_id):
+    """Squeeze today's events on one calendar into the time left before midnight.
+
+    Returns the BatchWriter results of the patches sent.
+    """
+    now, today_start, today_end = today()
+    events = load_events(service, today_start, today_end, calendar_id)
+    changes = plan_shrink(events, calendar_id, now)
+    if not changes:
+        return []
+
+    writer = BatchWriter(service, calendar_id)
+    queue_changes(writer, changes)
+    results = writer.execute()
+    report_updates(results)
+    return results
+
+
+async def shrink_calendar_async(client, calendar_id):
+    """shrink_calendar() over an AsyncCalendar, patching the events at once."""
+    now, today_start, today_end = today()
+    events = [
+        Event.from_api(item)
+        async for item in client.list_events(calendar_id, today_start, today_end)
+    ]
+    changes = plan_shrink(events, calendar_id, now)
+    if not changes:
+        return []
+
+    results = await client.send_changes(calendar_id, changes)
+    report_updates(results)
+    return results
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="drive every calendar from one asyncio client instead of a thread "
+        "each, for many calendars at once (needs httpx)",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        with planning(args.plan):
+            if args.use_async:
+                return asyncio.run(
+                    gather_calendars(
+                        args.calendars or ["primary"], shrink_calendar_async
+                    )
+                )
+            return for_each_calendar(
+                args.calendars, shrink_calendar, max_workers=args.workers
+            )
+    except (HttpError, ImportError) as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
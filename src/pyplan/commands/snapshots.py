@@ -0,0 +1,49 @@
+"""List the snapshots shrink saved for restore, without the network."""
+
+import argparse
+from datetime import datetime, timezone
+
+from pyplan.snapshots import SnapshotStore, describe
+
+DESCRIPTION = "List the snapshots shrink saved for restore."
+
+
+def list_snapshots(calendar_ids):
+    """Print the stored snapshots of calendars, or of all, and return them."""
+    store = SnapshotStore()
+    try:
+        rows = [
+            row
+            for calendar_id in calendar_ids or [None]
+            for row in store.snapshots(calendar_id)
+        ]
+    finally:
+        store.close()
+    for row in rows:
+        print(describe(row))
+    return [
+        {
+            "id": snapshot_id,
+            "calendar_id": calendar_id,
+            "day": day,
+            "taken_at": datetime.fromtimestamp(taken_at, timezone.utc).isoformat(),
+            "events": count,
+        }
+        for snapshot_id, calendar_id, day, taken_at, count in rows
+    ]
+
+
+def make_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=DESCRIPTION)
+    parser.add_argument(
+        "-c",
+        "--calendar",
+        dest="calendars",
+        action="append",
+        help="only list this calendar's snapshots, may be repeated",
+    )
+    return parser
+
+
+def run(args):
+    return list_snapshots(args.calendars)
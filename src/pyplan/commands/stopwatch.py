@@ -0,0 +1,257 @@
+import datetime
+import queue
+import sys
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.commands.shrink import save_original_event_data
+from pyplan.model import load_events
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import queue_changes
+from pyplan.planfile import apply_plan, planning
+from pyplan.stopwatch import DEFAULT_GRID, Debouncer, Stopwatch
+from pyplan.store import event_timestamp
+
+DESCRIPTION = (
+    "Time the running event with a stopwatch and move the rest of today's "
+    "events when it runs over or ends early."
+)
+HELP = (
+    "Enter (or 'done') ends the event and times the next, 'stop' only ends it, "
+    "'start' times the next one, a stopwatch reading (MM, MM:SS or H:MM:SS) "
+    "sets the time spent so far, and 'q' quits."
+)
+
+
+def clock_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M")
+
+
+def parse_reading(text):
+    """Seconds of a stopwatch reading: minutes, MM:SS or H:MM:SS."""
+    parts = text.split(":")
+    if len(parts) > 3:
+        raise ValueError(f"invalid stopwatch reading {text!r}")
+    if len(parts) == 1:
+        return float(parts[0]) * 60
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def read_commands(file, commands):
+    """Put the lines of file on the commands queue, and None at its end."""
+    for line in file:
+        commands.put(line.strip().lower())
+    commands.put(None)
+
+
+def send_changes(service, calendar_id, watch):
+    """Patch the events the stopwatch moved in one batch; returns the results."""
+    changes = watch.changes()
+    if not changes:
+        watch.sent()
+        return []
+
+    writer = BatchWriter(service, calendar_id)
+    queue_changes(writer, changes)
+    results = writer.execute()
+    failed = set()
+    for result in results:
+        if result["error"]:
+            print(f"Failed to update event {result['event_id']}: {result['error']}")
+            failed.add(result["event_id"])
+        else:
+            event = result["response"]
+            start, end = event_timestamp(event["start"]), event_timestamp(event["end"])
+            print(
+                f"Moved: {event.get('summary')} to {clock_time(start)}-{clock_time(end)}"
+            )
+    watch.sent(failed)
+    return results
+
+
+def time_events(
+    service,
+    calendar_id,
+    commands,
+    until=None,
+    event_id=None,
+    grid=DEFAULT_GRID,
+    settle=30.0,
+    max_wait=300.0,
+    tick=5.0,
+):
+    """Time today's events from the running one, moving the rest to match.
+
+    commands is a queue of input lines, None when input ends. The clock is
+    read every tick seconds; the moved events are patched once the layout
+    settles, and when the stopwatch quits. Returns the BatchWriter results.
+    """
+    now = datetime.datetime.now().astimezone()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + datetime.timedelta(days=1)
+    if until is not None:
+        day_end = datetime.datetime.combine(now.date(), until, now.tzinfo)
+
+    events = load_events(service, day_start, day_end, calendar_id)
+    watch = Stopwatch(events, day_end.timestamp(), grid)
+    index = watch.find(now.timestamp(), event_id)
+    if index is None:
+        print(f"No event {event_id} today." if event_id else "No events left today.")
+        return []
+
+    # Snapshot the day before the first change is sent, for restore.py
+    original = [event.body for event in watch.events]
+    debouncer = Debouncer(settle, max_wait)
+    results = []
+    # Stopwatch readings set how far the clock is ahead of the system time
+    offset = 0.0
+
+    def start(index=None):
+        event = watch.start(time.time() + offset, index)
+        if event is None:
+            print("No more events today.")
+        else:
+            print(f"Timing {event.summary} (until {clock_time(event.end)}).")
+        return event
+
+    def send():
+        nonlocal original
+        if original is not None and watch.changes():
+            save_original_event_data(original, calendar_id)
+            original = None
+        return send_changes(service, calendar_id, watch)
+
+    start(index)
+    print(HELP)
+    while True:
+        try:
+            command = commands.get(timeout=tick)
+        except queue.Empty:
+            command = "tick"
+        if command is None or command in ("q", "quit"):
+            break
+
+        clock = time.time() + offset
+        changed = False
+        if command == "tick":
+            changed = watch.tick(clock)
+        elif command in ("", "done", "stop"):
+            running = watch.running
+            changed = watch.stop(clock)
+            if running is not None:
+                print(f"Ended {running.summary} at {clock_time(running.end)}.")
+            offset = 0.0
+            if command != "stop":
+                start()
+        elif command == "start":
+            if watch.running is None:
+                start()
+        else:
+            try:
+                elapsed = parse_reading(command)
+            except ValueError:
+                print(HELP)
+                continue
+            if watch.running is not None:
+                offset = watch.started + elapsed - time.time()
+                changed = watch.tick(watch.started + elapsed)
+
+        if changed:
+            debouncer.changed(clock)
+            running = watch.running
+            if running is not None and command == "tick":
+                print(f"{running.summary} runs until {clock_time(running.end)}.")
+        if debouncer.due(clock):
+            results += send()
+            debouncer.sent()
+
+    results += send()
+    return results
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument(
+        "--event",
+        metavar="ID",
+        help="event to time first (default: the one running or next today)",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.time.fromisoformat,
+        help="end of the day events are kept before, HH:MM local time "
+        "(default: midnight)",
+    )
+    parser.add_argument(
+        "--grid",
+        type=int,
+        default=DEFAULT_GRID // 60,
+        metavar="MINUTES",
+        help=f"round the new times to this many minutes (default: {DEFAULT_GRID // 60})",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=30,
+        metavar="SECONDS",
+        help="send changes once they stop for this long (default: 30)",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=300,
+        metavar="SECONDS",
+        help="send changes at least this often while they keep coming (default: 300)",
+    )
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=5,
+        metavar="SECONDS",
+        help="how often the clock is read (default: 5)",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+    if args.calendars and len(args.calendars) > 1:
+        print("The stopwatch times one calendar at a time.")
+        return None
+
+    commands = queue.Queue()
+    threading.Thread(
+        target=read_commands, args=(sys.stdin, commands), daemon=True
+    ).start()
+    try:
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                time_events,
+                commands,
+                args.until,
+                args.event,
+                args.grid * 60,
+                args.settle,
+                args.max_wait,
+                args.tick,
+                max_workers=args.workers,
+            )
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import datetime
+
+from googleapiclient.errors import HttpError
+
+from pyplan.auth import tasks_service
+from pyplan.taskstore import TaskStore
+
+DESCRIPTION = "Mirror Google Tasks locally and print the task lists or open tasks."
+
+
+def make_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=DESCRIPTION)
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="read the local mirror without syncing it first",
+    )
+    parser.add_argument(
+        "--open",
+        action="store_true",
+        help="print the open tasks, those due first, instead of the lists",
+    )
+    parser.add_argument(
+        "-l",
+        "--list",
+        dest="lists",
+        action="append",
+        help="task list ID to print tasks of, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--due-before",
+        type=datetime.date.fromisoformat,
+        help="only print tasks due before this date (YYYY-MM-DD)",
+    )
+    return parser
+
+
+def run(args):
+    """Sync the mirror and print the task lists, or the open tasks; returns them."""
+    try:
+        store = TaskStore(None if args.offline else tasks_service())
+        try:
+            if not args.offline:
+                changed = store.sync()
+                print(f"Synced {changed} changed tasks.")
+
+            if args.open or args.lists or args.due_before:
+                tasks = store.open_tasks(args.lists, args.due_before)
+                if not tasks:
+                    print("No open tasks found.")
+                titles = dict(store.task_lists())
+                for task in tasks:
+                    due = task.get("due", "")[:10] or "no date"
+                    print(f"{due:10}  {task['title']} ({titles[task['tasklist']]})")
+                return tasks
+
+            lists = store.task_lists()
+            counts = store.counts()
+        finally:
+            store.close()
+
+        if not lists:
+            print("No task lists found.")
+            return []
+
+        print("Task lists:")
+        for list_id, title in lists:
+            open_count, completed = counts[list_id]
+            print(f"{title} ({list_id}): {open_count} open, {completed} completed")
+        return [
+            {
+                "id": list_id,
+                "title": title,
+                "open": counts[list_id][0],
+                "completed": counts[list_id][1],
+            }
+            for list_id, title in lists
+        ]
+    except HttpError as err:
+        print(err)
+
+
+def main():
+    """Shows basic usage of the Tasks API.
+    Prints the title and ID of every task list.
+    """
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Print prayer times from the cache or the local calculation, offline."""
+
+import argparse
+from datetime import date, timedelta
+
+from pyplan.prayertimes import (
+    DEFAULT_LOCATION,
+    DEFAULT_METHOD,
+    METHODS,
+    PrayerTimeCache,
+    cached_timings,
+    location_name,
+    parse_location,
+)
+
+DESCRIPTION = (
+    "Print prayer times from the cache or calculated locally, without the network."
+)
+
+
+def print_times(locations, start, days, method=DEFAULT_METHOD):
+    """Print days of timings from start for each location and return them."""
+    found = []
+    cache = PrayerTimeCache()
+    try:
+        for location in locations:
+            name = location_name(location)
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                timings, timezone = cached_timings(cache, location, day, method)
+                if timings is None:
+                    print(f"No prayer times available for {name} on {day}.")
+                    continue
+                print(
+                    f"{day}  {name}  "
+                    + "  ".join(f"{prayer} {time}" for prayer, time in timings.items())
+                )
+                found.append(
+                    {
+                        "location": list(location),
+                        "timezone": timezone,
+                        "day": day,
+                        "timings": timings,
+                    }
+                )
+    finally:
+        cache.close()
+    return found
+
+
+def make_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=DESCRIPTION)
+    parser.add_argument(
+        "-l",
+        "--location",
+        dest="locations",
+        action="append",
+        type=parse_location,
+        help="CITY,COUNTRY or LAT,LON,TZ to print times for, may be repeated "
+        "(default: Istanbul,Turkey)",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        help="first date, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--days", type=int, default=1, help="number of days (default: 1)"
+    )
+    parser.add_argument(
+        "--method",
+        type=int,
+        default=DEFAULT_METHOD,
+        choices=sorted(METHODS),
+        help=f"Aladhan calculation method (default: {DEFAULT_METHOD})",
+    )
+    return parser
+
+
+def run(args):
+    return print_times(
+        args.locations or [DEFAULT_LOCATION],
+        args.start or date.today(),
+        args.days,
+        args.method,
+    )
@@ -0,0 +1,65 @@
+import datetime
+
+from googleapiclient.errors import HttpError
+
+from pyplan.events import SUMMARY_FIELDS
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.store import list_events
+
+DESCRIPTION = "Print upcoming calendar events."
+UPCOMING_EVENTS = 10
+# How far ahead they are looked for, well inside the event store's window
+UPCOMING_DAYS = 90
+
+
+def print_upcoming_events(service, calendar_id):
+    """Prints the start and name of the upcoming events on one calendar.
+
+    Returns the events.
+    """
+    # Call the Calendar API
+    now = datetime.datetime.now(datetime.timezone.utc)
+    print(f"Getting the upcoming {UPCOMING_EVENTS} events")
+    events = list_events(
+        service,
+        now.isoformat(),
+        (now + datetime.timedelta(days=UPCOMING_DAYS)).isoformat(),
+        calendar_id=calendar_id,
+        fields=SUMMARY_FIELDS,
+    )[:UPCOMING_EVENTS]
+
+    if not events:
+        print("No upcoming events found.")
+        return events
+
+    # Prints the start and name of the next 10 events
+    for event in events:
+        start = event["start"].get("dateTime", event["start"].get("date"))
+        print(start, event["summary"])
+    return events
+
+
+def make_parser(prog=None):
+    return calendar_parser(DESCRIPTION, prog)
+
+
+def run(args):
+    """Run with parsed arguments and return the events by calendar ID."""
+    try:
+        return for_each_calendar(
+            args.calendars, print_upcoming_events, max_workers=args.workers
+        )
+
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    """Shows basic usage of the Google Calendar API.
+    Prints the start and name of the next 10 events on the user's calendar.
+    """
+    run(make_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
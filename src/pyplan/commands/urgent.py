@@ -0,0 +1,218 @@
+import datetime
+import random
+
+from googleapiclient.errors import HttpError
+
+from pyplan.batch import BatchWriter
+from pyplan.events import rfc3339
+from pyplan.freebusy import busy_spans
+from pyplan.intervals import IntervalIndex
+from pyplan.model import load_events
+from pyplan.parallel import calendar_parser, for_each_calendar
+from pyplan.plan import plan_changes, queue_changes
+from pyplan.planfile import apply_plan, planning
+from pyplan.rescale import shrink_by
+
+COLORS = {
+    "1": "Lavender",
+    "2": "Sage",
+    "3": "Grape",
+    "4": "Flamingo",
+    "5": "Banana",
+    "6": "Tangerine",
+    "7": "Peacock",
+    "8": "Graphite",
+    "9": "Blueberry",
+    "10": "Basil",
+    "11": "Tomato",
+}
+
+DESCRIPTION = "Squeeze an urgent task into today's schedule."
+
+
+def make_parser(prog=None):
+    parser = calendar_parser(DESCRIPTION, prog)
+    parser.add_argument("--summary", help="summary of the task; asked if left out")
+    parser.add_argument(
+        "--duration",
+        type=int,
+        metavar="MINUTES",
+        help="duration of the task in minutes; asked if left out",
+    )
+    parser.add_argument(
+        "--color",
+        help="color ID (1-11) or 'random'; asked if left out",
+    )
+    parser.add_argument(
+        "--busy-calendar",
+        dest="busy_calendars",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="also keep the task out of the busy time of this calendar, "
+        "may be repeated",
+    )
+    return parser
+
+
+def run(args):
+    """Run with parsed arguments and return the results by calendar ID."""
+    if args.apply:
+        return apply_plan(args.apply, args.workers)
+
+    try:
+        # Ask for whatever the flags left out
+        summary = args.summary
+        if summary is None:
+            summary = input("Enter the task summary: ")
+        duration_minutes = args.duration
+        if duration_minutes is None:
+            duration_minutes = int(input("Enter the duration of the task in minutes: "))
+        color_choice = args.color
+        if color_choice is None:
+            color_choice = input(
+                "Enter the color ID (1-11) or type 'random' for a random color: "
+            )
+        color_choice = color_choice.strip()
+
+        if color_choice.lower() == "random":
+            color_id = str(random.choice(list(COLORS.keys())))
+        else:
+            color_id = color_choice
+
+        if color_id not in COLORS:
+            print("Invalid color choice. Defaulting to color ID 1 (Lavender).")
+            color_id = "1"
+
+        with planning(args.plan):
+            return for_each_calendar(
+                args.calendars,
+                add_urgent_task,
+                summary,
+                duration_minutes,
+                color_id,
+                args.busy_calendars,
+                max_workers=args.workers,
+            )
+
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+
+
+def main():
+    run(make_parser().parse_args())
+
+
+def add_urgent_task(
+    service, calendar_id, summary, duration_minutes, color_id, busy_calendars=()
+):
+    """Shrink today's events on one calendar to make room for the task.
+
+    The task also stays out of the busy time of busy_calendars, which is
+    asked for in one free/busy query rather than by listing their events.
+    Returns the BatchWriter results of the writes sent.
+    """
+    # Calculate new event's duration in seconds
+    new_event_duration = datetime.timedelta(minutes=duration_minutes).total_seconds()
+
+    # Fetch events for the current day
+    now = datetime.datetime.now(datetime.UTC)
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = start_of_day + datetime.timedelta(days=1)
+
+    events = load_events(
+        service, start_of_day.isoformat(), end_of_day.isoformat(), calendar_id
+    )
+    # All-day events have no times to squeeze
+    events = [event for event in events if not event.all_day]
+
+    busy_calendars = [other for other in busy_calendars if other != calendar_id]
+    busy = []
+    if busy_calendars:
+        busy = busy_spans(service, busy_calendars, start_of_day, end_of_day)
+
+    # If there are no events, just insert the new event at the start of the day
+    if not events:
+        start_time = utc(IntervalIndex(busy).find_gap(new_event_duration, now))
+        end_time = start_time + datetime.timedelta(minutes=duration_minutes)
+        return create_event(
+            service, calendar_id, summary, start_time, end_time, color_id
+        )
+
+    # Shorten each event in proportion to its length to free up the task's time
+    new_ends = shrink_by(
+        [event.start for event in events],
+        [event.end for event in events],
+        new_event_duration,
+    )
+
+    for event, new_end in zip(events, new_ends):
+        event.end = float(new_end)
+
+    # Patch only the events whose end actually moved
+    writer = BatchWriter(service, calendar_id)
+    queue_changes(
+        writer,
+        plan_changes(
+            [event.body for event in events], [event.to_body() for event in events]
+        ),
+    )
+
+    # Find the first time slot from now that fits the new event, or the end of
+    # the last event if the rest of the day is full
+    schedule = IntervalIndex(
+        [(event.start, event.end, event) for event in events] + busy
+    )
+    gap = schedule.find_gap(duration_minutes * 60, now)
+    new_event_start = utc(gap)
+    new_event_end = new_event_start + datetime.timedelta(minutes=duration_minutes)
+
+    # Create the new event in the same batch as the updates
+    writer.insert(event_body(summary, new_event_start, new_event_end, color_id))
+
+    results = writer.execute()
+    for result in results:
+        if result["error"]:
+            print(f"Failed to {result['op']} event: {result['error']}")
+        elif result["op"] == "insert":
+            print(f"Event created: {result['response'].get('htmlLink')}")
+    return results
+
+
+def utc(timestamp):
+    """Epoch seconds as an aware UTC datetime."""
+    return datetime.datetime.fromtimestamp(timestamp, datetime.UTC)
+
+
+def event_body(summary, start_time, end_time, color_id):
+    """Builds the request body for a new event."""
+    return {
+        "summary": summary,
+        "start": {
+            "dateTime": rfc3339(start_time),
+            "timeZone": "UTC",
+        },
+        "end": {
+            "dateTime": rfc3339(end_time),
+            "timeZone": "UTC",
+        },
+        "colorId": color_id,
+    }
+
+
+def create_event(service, calendar_id, summary, start_time, end_time, color_id):
+    """Creates a new event in the Google Calendar."""
+    # Through a BatchWriter so --plan records it like the other writes
+    writer = BatchWriter(service, calendar_id)
+    writer.insert(event_body(summary, start_time, end_time, color_id))
+    results = writer.execute()
+    for result in results:
+        if result["error"]:
+            print(f"Failed to insert event: {result['error']}")
+        else:
+            print(f"Event created: {result['response'].get('htmlLink')}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Cron expressions: when the daemon's jobs run.
+
+The five standard fields are supported, minute hour day-of-month month
+day-of-week, each a *, a number or name, a range a-b, a step */n or a-b/n,
+or a comma separated list of those, plus the @hourly style shortcuts. As in
+cron, when both day fields are restricted a day matching either one runs.
+"""
+
+from datetime import datetime, timedelta
+
+SHORTCUTS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {
+    name: number
+    for number, name in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split(), 1
+    )
+}
+DAY_NAMES = {
+    name: number for number, name in enumerate("sun mon tue wed thu fri sat".split())
+}
+
+# (name, lowest, highest, names) of each field; 7 is also Sunday
+FIELDS = (
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day", 1, 31, {}),
+    ("month", 1, 12, MONTH_NAMES),
+    ("weekday", 0, 7, DAY_NAMES),
+)
+
+# Give up looking for a matching minute after this long, e.g. for "0 0 30 2 *"
+SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+def _value(text, names, field):
+    value = names.get(text.lower())
+    if value is None:
+        try:
+            value = int(text)
+        except ValueError:
+            raise ValueError(f"invalid {field} value {text!r}") from None
+    return value
+
+
+def parse_field(text, field, lowest, highest, names):
+    """The set of values a cron field matches."""
+    values = set()
+    for part in text.split(","):
+        span, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if span == "*":
+            first, last = lowest, highest
+        elif "-" in span:
+            first, last = (_value(end, names, field) for end in span.split("-", 1))
+        else:
+            first = _value(span, names, field)
+            # "5/15" means from 5 to the end in steps of 15
+            last = highest if step > 1 else first
+        if not lowest <= first <= last <= highest or step < 1:
+            raise ValueError(f"invalid {field} field {text!r}")
+        values.update(range(first, last + 1, step))
+    return values
+
+
+class Cron:
+    """A parsed cron expression."""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = SHORTCUTS.get(expression.strip(), expression).split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"expected 5 fields in cron expression {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_field(text, *field) for text, field in zip(fields, FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def __repr__(self):
+        return f"Cron({self.expression!r})"
+
+    def day_matches(self, day):
+        in_days = day.day in self.days
+        # Python counts weekdays from Monday, cron from Sunday
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def matches(self, moment):
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self.day_matches(moment)
+        )
+
+    def next_after(self, moment):
+        """The first matching minute after moment, skipping whole days and hours."""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + SEARCH_LIMIT
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = divmod(moment.month, 12)
+                moment = datetime(
+                    moment.year + year, month + 1, 1, tzinfo=moment.tzinfo
+                )
+            elif not self.day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"cron expression {self.expression!r} never matches")
@@ -0,0 +1,427 @@
+"""A resident pyplan that runs the subcommands on cron schedules.
+
+A cron-launched script pays for the interpreter, the Google client imports,
+the credentials and the service builds on every run. The daemon pays for
+them once: the subcommands are imported when it starts, the credentials are
+loaded once, and the shared worker pool keeps each worker's service. A job
+then costs about as much as its API calls.
+
+Jobs run one at a time on a single thread, since a --plan run records the
+writes of the whole process. They are read from a JSON file:
+
+    [
+        {"name": "prayer", "schedule": "0 1 * * *", "args": ["prayer", "--days", "7"]},
+        {"name": "shrink", "args": ["shrink", "-c", "work"]}
+    ]
+
+args are pyplan arguments after the program name, and a job without a
+schedule runs only when triggered. Commands run with an empty stdin, so one
+that would prompt must get every value as a flag; daemon, ctl and stopwatch
+wait on input or on the daemon itself and are refused. The daemon is controlled through a Unix
+socket that only its user may open. Each request and each reply is one
+line of JSON:
+
+    {"command": "jobs"}
+    {"command": "run", "job": "shrink"}
+    {"command": "run", "args": ["urgent", "--summary", "Call", "--duration", "15"]}
+    {"command": "stop"}
+
+A run waits for the job and replies with its results and output, unless
+"wait" is false.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from datetime import datetime
+
+from pyplan.cron import Cron
+from pyplan.paths import secrets_path
+
+JOBS_FILE = secrets_path("jobs.json")
+SOCKET_FILE = secrets_path("pyplan.sock")
+
+# Longest the scheduler sleeps, so a changed wall clock is noticed
+MAX_SLEEP = 60
+
+# Commands that would block the only worker: they read stdin until it ends,
+# or wait for jobs queued behind their own
+REFUSED_COMMANDS = {"daemon", "ctl", "stopwatch"}
+
+
+class Job:
+    """A named pyplan command line, run on a cron schedule or on request."""
+
+    def __init__(self, name, args, schedule=None):
+        self.name = name
+        self.args = list(args)
+        self.cron = None if schedule is None else Cron(schedule)
+        self.next_run = None
+        self.last_run = None
+        self.last_status = None
+        # Whether a run is queued or running, so a due job is not queued twice
+        self.pending = False
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "args": self.args,
+            "schedule": None if self.cron is None else self.cron.expression,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_status": self.last_status,
+        }
+
+
+def load_jobs(path=JOBS_FILE):
+    """The jobs of a jobs file, or none if there is no file."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        entries = json.load(file)
+    return [
+        Job(entry["name"], entry["args"], entry.get("schedule")) for entry in entries
+    ]
+
+
+def parse(args):
+    """Import a pyplan command and parse its arguments; returns (command, args).
+
+    Raises ValueError with argparse's message when the arguments are wrong.
+    """
+    from pyplan.cli import COMMANDS, load_command
+
+    if not args or args[0] not in COMMANDS:
+        raise ValueError(f"unknown command in {args!r}")
+    if args[0] in REFUSED_COMMANDS:
+        raise ValueError(f"{args[0]} cannot run in the daemon")
+    command, parser = load_command(args[0])
+    errors = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(errors), contextlib.redirect_stderr(errors):
+            return command, parser.parse_args(args[1:])
+    except SystemExit:
+        raise ValueError(errors.getvalue().strip()) from None
+
+
+@contextlib.contextmanager
+def empty_stdin():
+    """Swap sys.stdin for an empty file, so input() fails instead of waiting."""
+    stdin = sys.stdin
+    sys.stdin = io.StringIO()
+    try:
+        yield
+    finally:
+        sys.stdin = stdin
+
+
+def execute(args):
+    """Run a pyplan command line in this process.
+
+    Returns a dict with the status ("ok", "error" or "invalid"), the results
+    and everything the command printed.
+    """
+    started = time.perf_counter()
+    output = io.StringIO()
+    try:
+        command, command_args = parse(args)
+    except ValueError as error:
+        command = None
+        status, results = "invalid", None
+        output.write(f"{error}\n")
+    if command is not None:
+        from pyplan.cli import start_run
+
+        start_run()
+        try:
+            with (
+                contextlib.redirect_stdout(output),
+                contextlib.redirect_stderr(output),
+                empty_stdin(),
+            ):
+                results = command.run(command_args)
+            # The scripts report their errors and return None
+            status = "error" if results is None else "ok"
+        except EOFError:
+            status, results = "error", None
+            output.write("\nThe command asked for input; give it as flags instead.\n")
+        except Exception:
+            status, results = "error", None
+            output.write(traceback.format_exc())
+    return {
+        "status": status,
+        "results": results,
+        "output": output.getvalue(),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class Daemon:
+    """Runs jobs on their schedules and on requests from the control socket."""
+
+    def __init__(self, jobs, socket_path=SOCKET_FILE):
+        self.jobs = {job.name: job for job in jobs}
+        self.socket_path = socket_path
+        self.queue = queue.Queue()
+        self.stopping = threading.Event()
+        self.server = None
+        self.lock = threading.Lock()
+
+    def check(self):
+        """Parse every job's arguments, importing the commands they use."""
+        for job in self.jobs.values():
+            try:
+                parse(job.args)
+            except ValueError as error:
+                raise ValueError(f"job {job.name}: {error}") from None
+
+    def submit(self, args, job=None):
+        """Queue a command line, or a job; returns a Future of its outcome."""
+        future = Future()
+        with self.lock:
+            if job is not None:
+                if job.pending:
+                    future.set_result(
+                        {"status": "skipped", "output": "Already queued\n"}
+                    )
+                    return future
+                job.pending = True
+            self.queue.put((job, args, future))
+        return future
+
+    def work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            job, args, future = item
+            name = job.name if job else " ".join(args)
+            outcome = execute(args)
+            if job is not None:
+                with self.lock:
+                    job.pending = False
+                job.last_run = datetime.now().isoformat(timespec="seconds")
+                job.last_status = outcome["status"]
+            log(f"{name}: {outcome['status']} in {outcome['seconds']:.2f}s")
+            for line in outcome["output"].splitlines():
+                log(f"  {line}")
+            future.set_result(outcome)
+
+    def schedule(self):
+        scheduled = [job for job in self.jobs.values() if job.cron is not None]
+        now = datetime.now()
+        for job in scheduled:
+            job.next_run = job.cron.next_after(now)
+        while not self.stopping.is_set():
+            now = datetime.now()
+            for job in scheduled:
+                if job.next_run <= now:
+                    self.submit(job.args, job)
+                    job.next_run = job.cron.next_after(now)
+            if scheduled:
+                wait = min(job.next_run for job in scheduled) - datetime.now()
+                seconds = min(max(wait.total_seconds(), 0), MAX_SLEEP)
+            else:
+                seconds = MAX_SLEEP
+            self.stopping.wait(seconds)
+
+    def handle(self, message):
+        """Reply to one control request."""
+        command = message.get("command")
+        if command == "jobs":
+            return {"ok": True, "jobs": [job.describe() for job in self.jobs.values()]}
+        if command == "stop":
+            # ControlHandler stops the daemon once this reply is written
+            return {"ok": True}
+        if command != "run":
+            return {"ok": False, "error": f"unknown command {command!r}"}
+
+        if "job" in message:
+            job = self.jobs.get(message["job"])
+            if job is None:
+                return {"ok": False, "error": f"no job named {message['job']!r}"}
+            future = self.submit(job.args, job)
+        else:
+            future = self.submit(message.get("args") or [])
+        if not message.get("wait", True):
+            return {"ok": True, "status": "queued"}
+        outcome = future.result()
+        return {"ok": outcome["status"] in ("ok", "skipped"), **outcome}
+
+    def stop(self):
+        self.stopping.set()
+        if self.server is not None:
+            # shutdown() waits for serve_forever, so not from its own thread
+            threading.Thread(target=self.server.shutdown).start()
+
+    def serve(self):
+        """Run until stopped through the socket, SIGTERM or Ctrl-C."""
+        if os.path.exists(self.socket_path):
+            with contextlib.suppress(OSError), connect(self.socket_path):
+                raise RuntimeError(
+                    f"A daemon is already listening on {self.socket_path}"
+                )
+            # Left behind by a daemon that did not shut down
+            os.remove(self.socket_path)
+
+        self.check()
+        self.server = ControlServer(self.socket_path, ControlHandler)
+        self.server.daemon_instance = self
+        os.chmod(self.socket_path, 0o600)
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        worker = threading.Thread(target=self.work, name="pyplan-jobs")
+        scheduler = threading.Thread(
+            target=self.schedule, name="pyplan-scheduler", daemon=True
+        )
+        worker.start()
+        scheduler.start()
+        log(f"Listening on {self.socket_path} with {len(self.jobs)} jobs")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping.set()
+            self.queue.put(None)
+            worker.join()
+            self.server.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.socket_path)
+            log("Stopped")
+
+
+class ControlServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.daemon_instance
+        line = self.rfile.readline()
+        try:
+            message = json.loads(line)
+            reply = daemon.handle(message)
+        except (ValueError, AttributeError) as error:
+            message = None
+            reply = {"ok": False, "error": f"bad request: {error}"}
+        self.wfile.write(
+            json.dumps(reply, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        )
+        self.wfile.flush()
+        # Handler threads die with the server, so stop only after replying
+        if isinstance(message, dict) and message.get("command") == "stop":
+            daemon.stop()
+
+
+def log(message):
+    print(
+        f"{datetime.now():%Y-%m-%d %H:%M:%S} {message}", file=sys.__stdout__, flush=True
+    )
+
+
+def connect(path=SOCKET_FILE):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(message, path=SOCKET_FILE):
+    """Send one request to a running daemon and return its reply."""
+    with connect(path) as sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(message).encode("utf-8") + b"\n")
+        stream.flush()
+        reply = stream.readline()
+    if not reply:
+        raise ConnectionError("the daemon closed the connection without a reply")
+    return json.loads(reply)
+
+
+def make_parser(prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Run pyplan jobs on cron schedules, kept warm."
+    )
+    parser.add_argument(
+        "--jobs", default=JOBS_FILE, help=f"jobs file (default: {JOBS_FILE})"
+    )
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_FILE,
+        help=f"control socket to listen on (default: {SOCKET_FILE})",
+    )
+    return parser
+
+
+def run(args):
+    try:
+        Daemon(load_jobs(args.jobs), args.socket).serve()
+    except (RuntimeError, ValueError) as error:
+        print(f"An error occurred: {error}")
+        return None
+    return {}
+
+
+def control_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Control a pyplan daemon.")
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_FILE,
+        help=f"the daemon's control socket (default: {SOCKET_FILE})",
+    )
+    parser.add_argument(
+        "--no-wait",
+        dest="wait",
+        action="store_false",
+        help="queue the run and return without its results",
+    )
+    actions = parser.add_subparsers(dest="action", metavar="ACTION", required=True)
+    actions.add_parser("jobs", help="list the jobs and their next runs")
+    job = actions.add_parser("run", help="run a job now")
+    job.add_argument("job", help="name of the job")
+    command = actions.add_parser("exec", help="run a pyplan command in the daemon")
+    command.add_argument("args", nargs=argparse.REMAINDER, help="pyplan arguments")
+    actions.add_parser("stop", help="stop the daemon")
+    return parser
+
+
+def control(args):
+    """Send a control request and print the reply; returns the reply."""
+    message = {"command": "run" if args.action == "exec" else args.action}
+    if args.action == "run":
+        message.update(job=args.job, wait=args.wait)
+    elif args.action == "exec":
+        message.update(args=args.args, wait=args.wait)
+    try:
+        reply = request(message, args.socket)
+    except OSError as error:
+        print(f"Could not reach the daemon on {args.socket}: {error}")
+        return None
+
+    if not reply["ok"] and "error" in reply:
+        print(reply["error"])
+    for job in reply.get("jobs", []):
+        print(
+            f"{job['name']:12}  {job['schedule'] or 'on request':16}  "
+            f"next {job['next_run'] or '-'}  last {job['last_status'] or '-'}"
+        )
+    if reply.get("status") == "queued":
+        print("Queued")
+    if "output" in reply:
+        print(reply["output"], end="")
+        print(f"{reply['status']} in {reply.get('seconds', 0):.2f}s")
+    return reply if reply["ok"] else None
@@ -0,0 +1,71 @@
+"""Streaming, paginated listings over events().list."""
+
+# Partial-response mask for callers that only look at times and labels
+SUMMARY_FIELDS = "id,start,end,summary,colorId"
+
+# Largest page the Calendar API serves; the default is 250
+MAX_PAGE_SIZE = 2500
+
+
+def rfc3339(value):
+    """Format a datetime as RFC 3339, treating naive values as UTC."""
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is None:
+        return value.isoformat() + "Z"
+    return value.isoformat()
+
+
+def iter_pages(
+    service, calendar_id="primary", fields=None, max_results=MAX_PAGE_SIZE, **params
+):
+    """Yield every page of an events().list call, following nextPageToken.
+
+    fields is a mask for the items of each page, e.g. SUMMARY_FIELDS.
+    """
+    if fields is not None:
+        fields = f"nextPageToken,nextSyncToken,items({fields})"
+
+    page_token = None
+    while True:
+        page = (
+            service.events()
+            .list(
+                calendarId=calendar_id,
+                maxResults=max_results,
+                pageToken=page_token,
+                fields=fields,
+                **params,
+            )
+            .execute()
+        )
+        yield page
+
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def iter_events(
+    service,
+    calendar_id,
+    time_min,
+    time_max=None,
+    fields=None,
+    max_results=MAX_PAGE_SIZE,
+):
+    """Lazily yield the events overlapping a time range, ordered by start."""
+    params = {"timeMin": rfc3339(time_min)}
+    if time_max is not None:
+        params["timeMax"] = rfc3339(time_max)
+
+    for page in iter_pages(
+        service,
+        calendar_id,
+        fields,
+        max_results,
+        singleEvents=True,
+        orderBy="startTime",
+        **params,
+    ):
+        yield from page.get("items", [])
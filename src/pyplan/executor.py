@@ -0,0 +1,103 @@
+"""Central request executor: rate limiting, retries and a per-run budget.
+
+Every request built by calendar_service() is a CalendarRequest, so each
+call waits for the shared token bucket, counts against the run's request
+budget and is retried with exponential backoff and jitter when Google
+reports a transient or quota error.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from pyplan.ratelimit import calendar_limiter
+
+MAX_RETRIES = 6
+MAX_BACKOFF_SECONDS = 32
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+# Optional cap on the API calls one run may make, e.g. for cron jobs
+BUDGET_ENV = "PYPLAN_MAX_REQUESTS"
+
+
+class BudgetExceeded(Exception):
+    """Raised when a run has used up its request budget."""
+
+
+class RequestBudget:
+    """Thread-safe count of the API calls made by this run."""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.spent = 0
+        self.lock = threading.Lock()
+
+    def spend(self, count=1):
+        with self.lock:
+            if self.limit is not None and self.spent + count > self.limit:
+                raise BudgetExceeded(
+                    f"Request budget of {self.limit} calls used up ({self.spent} spent)"
+                )
+            self.spent += count
+
+    def reset(self):
+        """Start a new run, with none of the budget spent."""
+        with self.lock:
+            self.spent = 0
+
+
+run_budget = RequestBudget(
+    int(os.environ[BUDGET_ENV]) if os.environ.get(BUDGET_ENV) else None
+)
+
+
+def error_reason(error):
+    """The first "reason" in an API error body, if there is one."""
+    try:
+        return json.loads(error.content)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def is_retryable(error):
+    """Whether an HttpError is worth retrying after a backoff."""
+    status = error.resp.status
+    if status in RETRY_STATUSES:
+        return True
+    return status == 403 and error_reason(error) in RATE_LIMIT_REASONS
+
+
+def retry_delay(attempt):
+    """Exponential backoff with full-second jitter for the given attempt."""
+    return min(2**attempt, MAX_BACKOFF_SECONDS) + random.random()
+
+
+def call_with_retry(send, cost=1, retries=MAX_RETRIES):
+    """Call send() under the rate limiter and budget, retrying transient errors.
+
+    cost is the number of API calls send() makes, e.g. the size of a batch.
+    """
+    for attempt in range(retries + 1):
+        run_budget.spend(cost)
+        calendar_limiter.acquire(cost)
+        try:
+            return send()
+        except HttpError as error:
+            if attempt == retries or not is_retryable(error):
+                raise
+        time.sleep(retry_delay(attempt))
+
+
+class CalendarRequest(HttpRequest):
+    """HttpRequest that is sent through call_with_retry()."""
+
+    def execute(self, http=None, num_retries=0):
+        return call_with_retry(
+            lambda: HttpRequest.execute(self, http=http, num_retries=num_retries)
+        )
@@ -0,0 +1,416 @@
+"""In-memory stand-in for the Calendar v3 endpoints used by the scripts.
+
+FakeCalendar answers events list (with paging and syncToken), insert,
+update, patch, delete, freebusy query and batch requests. It has the same
+request() method as httplib2.Http, so it can be passed as http= to build():
+
+    fake = FakeCalendar(latency=0.05)
+    service = fake_service(fake)
+
+httpx_transport() serves the same data to the asyncio client. Latency and
+errors can be injected, and every call is counted for benchmarks.
+"""
+
+import email.parser
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, unquote, urlparse
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+
+from pyplan.auth import discovery_document
+from pyplan.executor import CalendarRequest
+from pyplan.store import event_timestamp, to_timestamp
+
+API_PREFIX = "/calendar/v3/"
+BATCH_PATH = "/batch/calendar/v3"
+DEFAULT_PAGE_SIZE = 250
+
+ERROR_REASONS = {
+    400: "badRequest",
+    404: "notFound",
+    409: "duplicate",
+    410: "deleted",
+    429: "rateLimitExceeded",
+    500: "backendError",
+    503: "backendError",
+}
+
+
+def fake_service(fake):
+    """Build a Calendar service whose requests are answered by fake."""
+    return build_from_document(
+        discovery_document("calendar", "v3"),
+        http=fake,
+        requestBuilder=CalendarRequest,
+    )
+
+
+def error_body(status, message):
+    return {
+        "error": {
+            "code": status,
+            "message": message,
+            "errors": [{"reason": ERROR_REASONS.get(status, "unknown")}],
+        }
+    }
+
+
+def apply_fields(result, fields):
+    """Apply a partial-response mask such as "nextPageToken,items(id,start)".
+
+    Only top-level keys and one level of item keys are supported.
+    """
+    if not fields:
+        return result
+
+    item_fields = None
+    match = re.search(r"items\(([^)]*)\)", fields)
+    if match:
+        item_fields = set(match.group(1).split(","))
+        fields = fields[: match.start()] + "items" + fields[match.end() :]
+
+    masked = {key: value for key, value in result.items() if key in fields.split(",")}
+    if item_fields and "items" in masked:
+        masked["items"] = [
+            {key: value for key, value in item.items() if key in item_fields}
+            for item in masked["items"]
+        ]
+    return masked
+
+
+class FakeCalendar:
+    """Thread-safe in-memory calendars behind an httplib2-style interface.
+
+    latency is slept once per HTTP request, error_rate is the chance that an
+    API call fails with one of error_statuses, and fail_next() queues
+    specific failures for the next calls.
+    """
+
+    def __init__(
+        self, latency=0.0, error_rate=0.0, error_statuses=(429, 503), seed=None
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calendars = {}
+        self.changes = {}
+        self.sequence = 0
+        self.queued_errors = []
+        self.calls = Counter()
+        self.http_requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    # -- test setup -----------------------------------------------------
+
+    def add_events(self, calendar_id, events):
+        """Store events directly, without counting them as API calls."""
+        with self.lock:
+            for event in events:
+                self._store(calendar_id, dict(event))
+
+    def events(self, calendar_id="primary"):
+        """Live events of a calendar, ordered by start."""
+        with self.lock:
+            events = [
+                event
+                for event in self.calendars.get(calendar_id, {}).values()
+                if event.get("status") != "cancelled"
+            ]
+        return sorted(events, key=lambda event: event_timestamp(event["start"]))
+
+    def fail_next(self, status, count=1):
+        """Make the next count API calls fail with status."""
+        with self.lock:
+            self.queued_errors.extend([status] * count)
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls.clear()
+            self.http_requests = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+
+    # -- httplib2 interface ---------------------------------------------
+
+    def request(
+        self,
+        uri,
+        method="GET",
+        body=None,
+        headers=None,
+        redirections=None,
+        connection_type=None,
+    ):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+        with self.lock:
+            self.http_requests += 1
+            self.bytes_sent += len(body or b"")
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = urlparse(uri).path
+        if path == BATCH_PATH:
+            status, content_type, content = self._batch(body, headers)
+        else:
+            status, result = self.dispatch(method, uri, body)
+            content_type = "application/json; charset=UTF-8"
+            content = b"" if result is None else json.dumps(result).encode("utf-8")
+
+        with self.lock:
+            self.bytes_received += len(content)
+        response = httplib2.Response({"status": status, "content-type": content_type})
+        return response, content
+
+    def httpx_transport(self):
+        """An httpx.MockTransport that serves requests from this fake."""
+        import httpx
+
+        def handle(request):
+            response, content = self.request(
+                str(request.url), request.method, request.content or None
+            )
+            return httpx.Response(
+                response.status,
+                content=content,
+                headers={"content-type": response["content-type"]},
+            )
+
+        return httpx.MockTransport(handle)
+
+    # -- request handling -----------------------------------------------
+
+    def dispatch(self, method, uri, body):
+        """Handle one API call and return (status, decoded response body)."""
+        parsed = urlparse(uri)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        parts = [unquote(part) for part in parsed.path[len(API_PREFIX) :].split("/")]
+        payload = json.loads(body) if body else None
+
+        with self.lock:
+            status = self._injected_error()
+            if status:
+                self.calls["injected_errors"] += 1
+                return status, error_body(status, "Injected error")
+
+            if parts == ["freeBusy"] and method == "POST":
+                self.calls["freebusy.query"] += 1
+                return self._freebusy(payload)
+            if len(parts) == 3 and parts[0] == "calendars" and parts[2] == "events":
+                calendar_id = parts[1]
+                if method == "GET":
+                    self.calls["events.list"] += 1
+                    return self._list(calendar_id, params)
+                if method == "POST":
+                    self.calls["events.insert"] += 1
+                    return self._insert(calendar_id, payload)
+            elif len(parts) == 4 and parts[0] == "calendars" and parts[2] == "events":
+                calendar_id, event_id = parts[1], parts[3]
+                if method == "GET":
+                    self.calls["events.get"] += 1
+                    return self._get(calendar_id, event_id)
+                if method in ("PUT", "PATCH"):
+                    self.calls[
+                        f"events.{'update' if method == 'PUT' else 'patch'}"
+                    ] += 1
+                    return self._modify(
+                        calendar_id, event_id, payload, method == "PATCH"
+                    )
+                if method == "DELETE":
+                    self.calls["events.delete"] += 1
+                    return self._delete(calendar_id, event_id)
+
+        return 404, error_body(404, f"No fake handler for {method} {parsed.path}")
+
+    def _injected_error(self):
+        if self.queued_errors:
+            return self.queued_errors.pop(0)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.random.choice(self.error_statuses)
+        return None
+
+    def _store(self, calendar_id, event):
+        self.sequence += 1
+        event.setdefault("id", uuid.uuid4().hex)
+        event.setdefault("status", "confirmed")
+        event["etag"] = f'"{self.sequence}"'
+        event["updated"] = datetime.now(timezone.utc).isoformat()
+        event["htmlLink"] = f"https://calendar.example/event?eid={event['id']}"
+        self.calendars.setdefault(calendar_id, {})[event["id"]] = event
+        self.changes.setdefault(calendar_id, {})[event["id"]] = self.sequence
+        return event
+
+    def _list(self, calendar_id, params):
+        events = self.calendars.get(calendar_id, {})
+        changes = self.changes.get(calendar_id, {})
+
+        if "syncToken" in params:
+            try:
+                since = int(params["syncToken"])
+            except ValueError:
+                return 410, error_body(410, "Sync token is no longer valid")
+            matching = [
+                events[event_id]
+                for event_id, sequence in changes.items()
+                if sequence > since
+            ]
+        else:
+            matching = [
+                event for event in events.values() if event.get("status") != "cancelled"
+            ]
+            if "timeMin" in params:
+                time_min = to_timestamp(params["timeMin"])
+                matching = [
+                    event
+                    for event in matching
+                    if event_timestamp(event["end"]) > time_min
+                ]
+            if "timeMax" in params:
+                time_max = to_timestamp(params["timeMax"])
+                matching = [
+                    event
+                    for event in matching
+                    if event_timestamp(event["start"]) < time_max
+                ]
+        matching.sort(
+            key=lambda event: event_timestamp(event["start"]) if "start" in event else 0
+        )
+
+        offset = int(params.get("pageToken", 0))
+        page_size = int(params.get("maxResults", DEFAULT_PAGE_SIZE))
+        result = {
+            "kind": "calendar#events",
+            "items": [dict(event) for event in matching[offset : offset + page_size]],
+        }
+        if offset + page_size < len(matching):
+            result["nextPageToken"] = str(offset + page_size)
+        else:
+            result["nextSyncToken"] = str(self.sequence)
+        return 200, apply_fields(result, params.get("fields"))
+
+    def _freebusy(self, body):
+        time_min = to_timestamp(body["timeMin"])
+        time_max = to_timestamp(body["timeMax"])
+        calendars = {}
+        for item in body.get("items", []):
+            if item["id"] not in self.calendars:
+                calendars[item["id"]] = {"errors": [{"reason": "notFound"}]}
+                continue
+            spans = sorted(
+                (
+                    max(event_timestamp(event["start"]), time_min),
+                    min(event_timestamp(event["end"]), time_max),
+                )
+                for event in self.calendars[item["id"]].values()
+                if event.get("status") != "cancelled"
+                and event.get("transparency") != "transparent"
+                and "dateTime" in event["start"]
+                and event_timestamp(event["end"]) > time_min
+                and event_timestamp(event["start"]) < time_max
+            )
+            busy = []
+            for start, end in spans:
+                if busy and start <= busy[-1][1]:
+                    busy[-1][1] = max(busy[-1][1], end)
+                else:
+                    busy.append([start, end])
+            calendars[item["id"]] = {
+                "busy": [
+                    {
+                        key: datetime.fromtimestamp(value, timezone.utc).isoformat()
+                        for key, value in (("start", start), ("end", end))
+                    }
+                    for start, end in busy
+                ]
+            }
+        return 200, {
+            "kind": "calendar#freeBusy",
+            "timeMin": body["timeMin"],
+            "timeMax": body["timeMax"],
+            "calendars": calendars,
+        }
+
+    def _get(self, calendar_id, event_id):
+        event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            return 404, error_body(404, "Not Found")
+        return 200, dict(event)
+
+    def _insert(self, calendar_id, body):
+        existing = self.calendars.get(calendar_id, {}).get(body.get("id"))
+        if existing is not None and existing.get("status") != "cancelled":
+            return 409, error_body(409, "The requested identifier already exists.")
+        body.pop("status", None)
+        return 200, dict(self._store(calendar_id, body))
+
+    def _modify(self, calendar_id, event_id, body, partial):
+        event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            return 404, error_body(404, "Not Found")
+        if event.get("status") == "cancelled":
+            return 410, error_body(410, "Resource has been deleted")
+
+        updated = dict(event) if partial else {"id": event_id}
+        updated.update(body)
+        updated["id"] = event_id
+        return 200, dict(self._store(calendar_id, updated))
+
+    def _delete(self, calendar_id, event_id):
+        event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            return 404, error_body(404, "Not Found")
+        if event.get("status") == "cancelled":
+            return 410, error_body(410, "Resource has been deleted")
+
+        self._store(calendar_id, {"id": event_id, "status": "cancelled"})
+        return 204, None
+
+    def _batch(self, body, headers):
+        message = email.parser.BytesParser().parsebytes(
+            b"content-type: "
+            + headers["content-type"].encode("utf-8")
+            + b"\r\n\r\n"
+            + body
+        )
+        boundary = uuid.uuid4().hex
+        lines = []
+
+        for part in message.get_payload():
+            request_line, _, rest = part.get_payload().partition("\n")
+            method, target, _ = request_line.split(" ", 2)
+            _, _, request_body = rest.partition("\n\n")
+            status, result = self.dispatch(
+                method,
+                "https://www.googleapis.com" + target,
+                request_body.strip() or None,
+            )
+            content = "" if result is None else json.dumps(result)
+            content_id = part["Content-ID"]
+            lines += [
+                f"--{boundary}",
+                "Content-Type: application/http",
+                f"Content-ID: <response-{content_id[1:-1]}>",
+                "",
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}",
+                "Content-Type: application/json; charset=UTF-8",
+                f"Content-Length: {len(content.encode('utf-8'))}",
+                "",
+                content,
+            ]
+        lines.append(f"--{boundary}--")
+
+        content = "\r\n".join(lines).encode("utf-8")
+        return 200, f"multipart/mixed; boundary={boundary}", content
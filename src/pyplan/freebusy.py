@@ -0,0 +1,162 @@
+"""Busy time of calendars from freebusy().query, cached for a while.
+
+Checking a slot for collisions only needs the busy spans of a calendar,
+not its events. One freebusy query answers for up to MAX_CALENDARS
+calendars with bare (start, end) pairs, instead of a listing per calendar
+with every description, attendee and reminder. Answers are kept in SQLite
+for ttl seconds, so scripts run back to back, or the daemon's jobs, ask
+once for the same span.
+
+Free/busy leaves out transparent events and merges the rest, so callers
+that need IDs, summaries or bodies still list events.
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from pyplan.events import rfc3339
+from pyplan.paths import secrets_path
+from pyplan.store import to_timestamp
+
+BUSY_CACHE_FILE = secrets_path("busy.db")
+
+# Calendars the API answers for in one query
+MAX_CALENDARS = 50
+
+DEFAULT_TTL = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS busy (
+    calendar_id TEXT NOT NULL,
+    time_min REAL NOT NULL,
+    time_max REAL NOT NULL,
+    fetched REAL NOT NULL,
+    spans TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS busy_by_calendar ON busy (calendar_id, fetched);
+"""
+
+
+def query_busy(service, calendar_ids, time_min, time_max):
+    """{calendar_id: [(start, end)]} busy between two epoch seconds, from the API.
+
+    Calendars are asked for MAX_CALENDARS at a time. Those the API reports
+    errors for, such as ones the user cannot see, are printed and left out.
+    """
+    time_min, time_max = (
+        rfc3339(datetime.fromtimestamp(value, timezone.utc))
+        for value in (time_min, time_max)
+    )
+    busy = {}
+    for offset in range(0, len(calendar_ids), MAX_CALENDARS):
+        chunk = calendar_ids[offset : offset + MAX_CALENDARS]
+        response = (
+            service.freebusy()
+            .query(
+                body={
+                    "timeMin": time_min,
+                    "timeMax": time_max,
+                    "items": [{"id": calendar_id} for calendar_id in chunk],
+                }
+            )
+            .execute()
+        )
+        for calendar_id, answer in response.get("calendars", {}).items():
+            if answer.get("errors"):
+                reasons = ", ".join(error["reason"] for error in answer["errors"])
+                print(f"No free/busy time for calendar {calendar_id}: {reasons}")
+                continue
+            busy[calendar_id] = [
+                (to_timestamp(span["start"]), to_timestamp(span["end"]))
+                for span in answer.get("busy", [])
+            ]
+    return busy
+
+
+class BusyProvider:
+    """Busy spans of calendars, from a cache younger than ttl or the API."""
+
+    def __init__(self, service, ttl=DEFAULT_TTL, path=BUSY_CACHE_FILE):
+        self.service = service
+        self.ttl = ttl
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _cached(self, calendar_id, time_min, time_max):
+        """Cached spans covering [time_min, time_max], or None."""
+        row = self.db.execute(
+            "SELECT spans FROM busy WHERE calendar_id = ? AND time_min <= ? "
+            "AND time_max >= ? AND fetched >= ? ORDER BY fetched DESC LIMIT 1",
+            (calendar_id, time_min, time_max, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return [
+            (max(start, time_min), min(end, time_max))
+            for start, end in json.loads(row[0])
+            if end > time_min and start < time_max
+        ]
+
+    def busy(self, calendar_ids, time_min, time_max):
+        """{calendar_id: [(start, end)]} busy epoch seconds within the span.
+
+        Only the calendars missing from the cache are queried, together.
+        """
+        time_min, time_max = to_timestamp(time_min), to_timestamp(time_max)
+        busy = {}
+        missing = []
+        for calendar_id in dict.fromkeys(calendar_ids):
+            spans = self._cached(calendar_id, time_min, time_max)
+            if spans is None:
+                missing.append(calendar_id)
+            else:
+                busy[calendar_id] = spans
+        if not missing:
+            return busy
+
+        fetched = query_busy(self.service, missing, time_min, time_max)
+        now = time.time()
+        with self.db:
+            self.db.execute("DELETE FROM busy WHERE fetched < ?", (now - self.ttl,))
+            self.db.executemany(
+                "INSERT INTO busy VALUES (?, ?, ?, ?, ?)",
+                (
+                    (calendar_id, time_min, time_max, now, json.dumps(spans))
+                    for calendar_id, spans in fetched.items()
+                ),
+            )
+        busy.update(fetched)
+        return busy
+
+    def forget(self, calendar_id):
+        """Drop the cached spans of a calendar, e.g. after writing to it."""
+        with self.db:
+            self.db.execute("DELETE FROM busy WHERE calendar_id = ?", (calendar_id,))
+
+
+def busy_spans(service, calendar_ids, time_min, time_max, ttl=DEFAULT_TTL):
+    """(start, end, calendar_id) of the busy time of calendars, for an IntervalIndex."""
+    provider = BusyProvider(service, ttl)
+    try:
+        busy = provider.busy(calendar_ids, time_min, time_max)
+    finally:
+        provider.close()
+    return [
+        (start, end, calendar_id)
+        for calendar_id, spans in busy.items()
+        for start, end in spans
+    ]
+
+
+def forget_busy(calendar_id):
+    """Drop the cached busy time of a calendar that was just written to."""
+    provider = BusyProvider(None)
+    try:
+        provider.forget(calendar_id)
+    finally:
+        provider.close()
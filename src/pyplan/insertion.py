@@ -0,0 +1,133 @@
+"""Insert events at fixed times and push the events in their way.
+
+An insertion is pinned at its times. An existing event overlapping one, or
+pushed into by an event moved before it, moves later, keeping its length
+and order, and hops over any insertion it would run into. Events nothing
+pushes keep their times, so one pass over a sorted day moves only what it
+has to. When moved events would run past the end of the day, those after
+the last insertion are squeezed into the time left, as shrink does.
+"""
+
+from datetime import date, time
+
+from pyplan.cron import DAY_NAMES, parse_field
+from pyplan.rescale import squeeze
+
+# Squeezed events are laid out on whole minutes by default
+DEFAULT_GRID = 60
+
+
+class Insertion:
+    """An event to insert at the given times of the days it is on."""
+
+    __slots__ = ("summary", "duration", "times", "weekdays", "dates", "color_id")
+
+    def __init__(
+        self, summary, duration, times, weekdays=None, dates=None, color_id=None
+    ):
+        self.summary = summary
+        self.duration = duration
+        self.times = times
+        self.weekdays = weekdays
+        self.dates = dates
+        self.color_id = color_id
+
+    def __repr__(self):
+        return f"Insertion({self.summary!r}, {self.duration}, {self.times!r})"
+
+    def on(self, day):
+        """Whether the insertion is made on a day; every day without days."""
+        if self.weekdays is None and self.dates is None:
+            return True
+        # Python counts weekdays from Monday, cron from Sunday
+        return (day.weekday() + 1) % 7 in (self.weekdays or ()) or day in (
+            self.dates or ()
+        )
+
+
+def parse_times(text):
+    """Clock times of a comma separated list such as "10:00,12:30"."""
+    return [time.fromisoformat(part.strip()) for part in text.split(",")]
+
+
+def parse_days(text):
+    """(weekdays, dates) of a list such as "mon-fri", "sat,sun" or "2024-09-02".
+
+    Weekdays are cron style, Sunday 0; either is None when none were given.
+    """
+    names, dates = [], set()
+    for part in text.split(","):
+        part = part.strip()
+        try:
+            dates.add(date.fromisoformat(part))
+        except ValueError:
+            names.append(part)
+    weekdays = None
+    if names:
+        weekdays = {
+            day % 7 for day in parse_field(",".join(names), "weekday", 0, 7, DAY_NAMES)
+        }
+    return weekdays, dates or None
+
+
+def parse_insertion(fields, color_id=None):
+    """An Insertion of [summary, minutes, times] and optional days fields."""
+    if not 3 <= len(fields) <= 4:
+        raise ValueError(f"expected SUMMARY MINUTES TIMES [DAYS], got {fields!r}")
+    summary, minutes, times = fields[:3]
+    weekdays, dates = parse_days(fields[3]) if len(fields) == 4 else (None, None)
+    return Insertion(
+        summary, int(minutes) * 60, parse_times(times), weekdays, dates, color_id
+    )
+
+
+def _push(spans, durations, pins):
+    """Lay spans out with the given durations around the sorted pins."""
+    placed = []
+    # End of the latest moved event; events starting before it are pushed
+    cursor = None
+    position = 0
+    for (start, end), duration in zip(spans, durations):
+        new_start = start if cursor is None else max(start, cursor)
+        # Starts only grow, so pins ending before one never matter again
+        while position < len(pins) and pins[position][1] <= new_start:
+            position += 1
+        for pin_start, pin_end in pins[position:]:
+            if pin_start >= new_start + duration:
+                break
+            new_start = max(new_start, pin_end)
+        new_end = new_start + duration
+        if new_start != start or new_end != end:
+            cursor = new_end if cursor is None else max(cursor, new_end)
+        placed.append((new_start, new_end))
+    return placed
+
+
+def displace(spans, pins, day_end, min_duration=0.0, grid=DEFAULT_GRID):
+    """New (start, end) of a day's spans, laid out around pinned insertions.
+
+    spans are the (start, end) of the existing events sorted by start, pins
+    the (start, end) of the insertions sorted by start. If moved events
+    would end after day_end, the moved events after the last insertion fill
+    the time from it to day_end, shortened to no less than min_duration,
+    with their boundaries rounded to grid seconds.
+    """
+    placed = _push(spans, [end - start for start, end in spans], pins)
+    moved = [index for index, (new, old) in enumerate(zip(placed, spans)) if new != old]
+    if not moved or max(placed[index][1] for index in moved) <= day_end:
+        return placed
+
+    # Only events pushed past the last insertion can run into the day's end
+    window_start = max((end for start, end in pins if start < day_end), default=day_end)
+    tail = [index for index in moved if placed[index][0] >= window_start]
+    starts, ends = squeeze(
+        [placed[index][0] for index in tail],
+        [placed[index][1] for index in tail],
+        min(window_start, day_end),
+        day_end,
+        min_duration=min_duration,
+        grid=grid,
+    )
+    for index, start, end in zip(tail, starts, ends):
+        placed[index] = (float(start), float(end))
+    return placed
@@ -0,0 +1,99 @@
+"""Sorted interval index over event spans for collision and slot queries."""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from pyplan.store import to_timestamp
+
+
+def _seconds(value):
+    """Epoch seconds of a number, datetime, date or RFC 3339 string."""
+    if isinstance(value, (int, float)):
+        return value
+    return to_timestamp(value)
+
+
+class IntervalIndex:
+    """Half-open [start, end) spans sorted by start, built once per listing.
+
+    Times may be given as epoch seconds, datetimes or RFC 3339 strings and
+    are returned as epoch seconds. Overlap queries take O(log n + k) for
+    typical calendars; gap searches run over the merged busy spans.
+    """
+
+    def __init__(self, spans=()):
+        spans = sorted(
+            (span for span in spans if span[1] > span[0]), key=lambda span: span[0]
+        )
+        self.starts = [start for start, _, _ in spans]
+        self.ends = [end for _, end, _ in spans]
+        self.items = [item for _, _, item in spans]
+        # Latest end among the spans up to each position, so overlap scans can
+        # stop as soon as nothing further left can reach the query start
+        self.max_ends = list(accumulate(self.ends, max))
+        self.busy = self._merge()
+        self.busy_starts = [start for start, _ in self.busy]
+
+    @classmethod
+    def from_events(cls, events):
+        """Index timed Events by their start and end; all-day events are skipped."""
+        return cls(
+            (event.start, event.end, event) for event in events if not event.all_day
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _merge(self):
+        busy = []
+        for start, end in zip(self.starts, self.ends):
+            if busy and start <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], end)
+            else:
+                busy.append([start, end])
+        return [tuple(span) for span in busy]
+
+    def overlapping(self, start, end):
+        """Items whose span overlaps [start, end), ordered by start."""
+        start, end = _seconds(start), _seconds(end)
+        found = []
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self.max_ends[position] > start:
+            if self.ends[position] > start:
+                found.append(self.items[position])
+            position -= 1
+        found.reverse()
+        return found
+
+    def is_free(self, start, end):
+        """Whether nothing overlaps [start, end)."""
+        start, end = _seconds(start), _seconds(end)
+        position = bisect_left(self.starts, end) - 1
+        return position < 0 or self.max_ends[position] <= start
+
+    def free_slots(self, start, end):
+        """Yield the (start, end) gaps between busy spans within [start, end)."""
+        start, end = _seconds(start), _seconds(end)
+        cursor = start
+        position = max(bisect_right(self.busy_starts, start) - 1, 0)
+        for busy_start, busy_end in self.busy[position:]:
+            if busy_start >= end:
+                break
+            if busy_start > cursor:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+        if cursor < end:
+            yield cursor, end
+
+    def find_gap(self, duration, start, end=None):
+        """Start of the first gap of at least duration seconds after start.
+
+        Without end the search runs past the last busy span, so a gap is
+        always found; otherwise None is returned when [start, end) is full.
+        """
+        start = _seconds(start)
+        limit = float("inf") if end is None else _seconds(end)
+        for gap_start, gap_end in self.free_slots(start, limit):
+            if gap_end - gap_start >= duration:
+                return gap_start
+        return None
@@ -0,0 +1,102 @@
+"""Compact parsed events, built once when a listing is fetched."""
+
+from datetime import datetime, timezone
+
+from pyplan.events import rfc3339
+from pyplan.store import list_events, to_timestamp
+
+
+class Event:
+    """An event with its start and end parsed to epoch seconds.
+
+    Scripts work on the numeric start and end and only serialize back to an
+    API body with to_body() when writing. body keeps the listed resource so
+    fields the scripts don't touch survive an update; it is None when the
+    event was built with keep_body=False.
+    """
+
+    __slots__ = ("id", "etag", "summary", "color_id", "start", "end", "all_day", "body")
+
+    def __init__(
+        self,
+        id,
+        start,
+        end,
+        summary=None,
+        color_id=None,
+        etag=None,
+        all_day=False,
+        body=None,
+    ):
+        self.id = id
+        self.start = start
+        self.end = end
+        self.summary = summary
+        self.color_id = color_id
+        self.etag = etag
+        self.all_day = all_day
+        self.body = body
+
+    @classmethod
+    def from_api(cls, item, keep_body=True):
+        """Parse an events resource as returned by the API."""
+        all_day = "dateTime" not in item["start"]
+        key = "date" if all_day else "dateTime"
+        return cls(
+            item.get("id"),
+            to_timestamp(item["start"][key]),
+            to_timestamp(item["end"][key]),
+            item.get("summary"),
+            item.get("colorId"),
+            item.get("etag"),
+            all_day,
+            item if keep_body else None,
+        )
+
+    def __repr__(self):
+        return f"Event({self.id!r}, {self.start!r}, {self.end!r}, {self.summary!r})"
+
+    @property
+    def duration(self):
+        """Length of the event in seconds."""
+        return self.end - self.start
+
+    def to_body(self):
+        """The API body for writing this event back, with its current times."""
+        body = dict(self.body or {})
+        if self.id is not None:
+            body["id"] = self.id
+        if self.summary is not None:
+            body["summary"] = self.summary
+        if self.color_id is not None:
+            body["colorId"] = self.color_id
+        body["start"] = self._when("start", self.start)
+        body["end"] = self._when("end", self.end)
+        return body
+
+    def _when(self, key, timestamp):
+        when = {}
+        time_zone = (self.body or {}).get(key, {}).get("timeZone")
+        if time_zone:
+            when["timeZone"] = time_zone
+        moment = datetime.fromtimestamp(timestamp, timezone.utc)
+        if self.all_day:
+            when["date"] = moment.date().isoformat()
+        else:
+            when["dateTime"] = rfc3339(moment)
+        return when
+
+
+def load_events(
+    service,
+    time_min,
+    time_max=None,
+    calendar_id="primary",
+    fields=None,
+    keep_body=True,
+):
+    """list_events(), parsed into Event objects."""
+    return [
+        Event.from_api(item, keep_body)
+        for item in list_events(service, time_min, time_max, calendar_id, fields)
+    ]
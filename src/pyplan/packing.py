@@ -0,0 +1,150 @@
+"""Pack tasks into the free time of a calendar, earliest deadline first.
+
+Google Tasks have no duration or priority, so they are read from the title
+or notes: "[45m]", "[1h]" or "[1h30m]" for the duration and "!1" (most
+urgent) to "!3" for the priority. A task's deadline is the end of the
+working day of its due date.
+
+pack() orders the work by deadline, then priority, then longest first, and
+puts each piece in the earliest gap that fits, which is O(tasks x gaps) and
+takes milliseconds for a week of hundreds of tasks. Work that cannot finish
+by its deadline is placed in a second pass, after it, and marked late.
+"""
+
+import re
+from datetime import datetime, time, timedelta
+
+from pyplan.store import to_timestamp
+
+DURATION = re.compile(r"\[\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m(?:in)?)?\s*\]", re.I)
+PRIORITY = re.compile(r"(?<!\S)!([1-3])(?!\S)")
+
+DEFAULT_DURATION = 30 * 60
+# Priority of tasks without a "!n", after every marked one
+NO_PRIORITY = 4
+
+
+class Work:
+    """A piece of work to place: its duration and deadline in seconds."""
+
+    __slots__ = ("summary", "duration", "deadline", "priority", "item")
+
+    def __init__(
+        self, summary, duration, deadline=float("inf"), priority=NO_PRIORITY, item=None
+    ):
+        self.summary = summary
+        self.duration = duration
+        self.deadline = deadline
+        self.priority = priority
+        self.item = item
+
+    def __repr__(self):
+        return f"Work({self.summary!r}, {self.duration}, {self.deadline})"
+
+
+def parse_duration(text):
+    """Seconds of the first "[1h30m]" style duration in text, or None."""
+    for match in DURATION.finditer(text or ""):
+        hours, minutes = match.groups()
+        if hours or minutes:
+            return (int(hours or 0) * 60 + int(minutes or 0)) * 60
+    return None
+
+
+def parse_priority(text):
+    """The "!n" priority in text, or None."""
+    match = PRIORITY.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+def clean_title(title):
+    """A task title without its duration and priority markers."""
+    title = PRIORITY.sub("", DURATION.sub("", title or ""))
+    return " ".join(title.split())
+
+
+def local_timestamp(day, clock):
+    """Epoch seconds of a wall clock time on a day, in the local time zone."""
+    return datetime.combine(day, clock).astimezone().timestamp()
+
+
+def task_work(task, day_end=time(18), default_duration=DEFAULT_DURATION):
+    """Work for a Google task body, as the tasks mirror returns them."""
+    title, notes = task.get("title"), task.get("notes")
+    duration = parse_duration(title) or parse_duration(notes) or default_duration
+    priority = parse_priority(title) or parse_priority(notes) or NO_PRIORITY
+    deadline = float("inf")
+    if task.get("due"):
+        # Tasks only keep the date of their due time
+        due = datetime.fromisoformat(task["due"].replace("Z", "+00:00")).date()
+        deadline = local_timestamp(due, day_end)
+    return Work(
+        clean_title(title) or "Untitled task", duration, deadline, priority, task
+    )
+
+
+def working_windows(start, days, day_start=time(9), day_end=time(18)):
+    """(start, end) epoch seconds of the working hours of days days from start."""
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        yield local_timestamp(day, day_start), local_timestamp(day, day_end)
+
+
+def free_gaps(index, windows, not_before=None):
+    """The free [start, end] gaps of an IntervalIndex within the windows."""
+    gaps = []
+    for window_start, window_end in windows:
+        if not_before is not None:
+            window_start = max(window_start, to_timestamp(not_before))
+        if window_start < window_end:
+            gaps.extend(
+                [gap_start, gap_end]
+                for gap_start, gap_end in index.free_slots(window_start, window_end)
+            )
+    return gaps
+
+
+def _first_fit(gaps, work, before, buffer):
+    """Take the earliest gap fitting work that starts it by before; its start or None."""
+    for position, (gap_start, gap_end) in enumerate(gaps):
+        if gap_start + work.duration > before:
+            # Later gaps start later still
+            return None
+        if gap_end - gap_start >= work.duration:
+            gaps[position][0] = gap_start + work.duration + buffer
+            if gaps[position][0] >= gap_end:
+                del gaps[position]
+            return gap_start
+    return None
+
+
+def pack(works, gaps, buffer=0, allow_late=True):
+    """Place works in the gaps, earliest deadline first.
+
+    gaps are sorted [start, end] lists and are used up in place; buffer
+    seconds are kept free after each placement. Returns (placements,
+    unplaced), where placements are (work, start, end, late) tuples ordered
+    by start.
+    """
+    order = sorted(
+        works, key=lambda work: (work.deadline, work.priority, -work.duration)
+    )
+    placements = []
+    missed = []
+    for work in order:
+        start = _first_fit(gaps, work, work.deadline, buffer)
+        if start is None:
+            missed.append(work)
+        else:
+            placements.append((work, start, start + work.duration, False))
+
+    unplaced = []
+    for work in missed:
+        start = _first_fit(gaps, work, float("inf"), buffer) if allow_late else None
+        if start is None:
+            unplaced.append(work)
+        else:
+            placements.append((work, start, start + work.duration, True))
+
+    placements.sort(key=lambda placement: placement[1])
+    return placements, unplaced
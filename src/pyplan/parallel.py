@@ -0,0 +1,84 @@
+"""Run a script's work over several calendars on a thread pool."""
+
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pyplan.auth import calendar_service
+
+MAX_WORKERS = 8
+
+# Worker pools by size, kept for the life of the process so that a long
+# running one, like the daemon, reuses each worker's service and connection
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def calendar_parser(description, prog=None):
+    """Argument parser with the options shared by the calendar scripts."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument(
+        "-c",
+        "--calendar",
+        dest="calendars",
+        action="append",
+        help="calendar ID to work on, may be repeated (default: primary)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"calendars handled at once (default: {MAX_WORKERS})",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--plan",
+        metavar="FILE",
+        help="write the intended operations to FILE as JSON lines ('-' for "
+        "stdout) instead of sending them",
+    )
+    mode.add_argument(
+        "--apply",
+        metavar="FILE",
+        help="send the operations of a plan written with --plan",
+    )
+    return parser
+
+
+def worker_pool(max_workers=MAX_WORKERS):
+    """The shared thread pool with max_workers workers."""
+    with _pools_lock:
+        if max_workers not in _pools:
+            _pools[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="pyplan-worker"
+            )
+        return _pools[max_workers]
+
+
+def for_each_calendar(calendar_ids, task, *args, max_workers=MAX_WORKERS):
+    """Call task(service, calendar_id, *args) for every calendar.
+
+    Each worker thread builds its own service, and so its own authorized
+    http, because httplib2 is not thread-safe. The workers outlive the call,
+    so later calls reuse their services. Returns a dict of results by
+    calendar ID; calendars that fail, with an HttpError, a request budget
+    run out or an error of their own, are reported and left out.
+    """
+    calendar_ids = calendar_ids or ["primary"]
+
+    def run(calendar_id):
+        return task(calendar_service(), calendar_id, *args)
+
+    pool = worker_pool(max_workers)
+    futures = {
+        calendar_id: pool.submit(run, calendar_id) for calendar_id in calendar_ids
+    }
+    results = {}
+    for calendar_id, future in futures.items():
+        try:
+            results[calendar_id] = future.result()
+        except Exception as error:
+            # One calendar failing, on the API or the local stores, leaves
+            # the others running
+            print(f"An error occurred on calendar {calendar_id}: {error}")
+    return results
@@ -0,0 +1,12 @@
+"""Where pyplan keeps its credentials, tokens and local databases."""
+
+import os.path
+
+# Environment variable naming the secrets directory, for running the scripts
+# from anywhere; without it the directory is ./secrets
+SECRETS_ENV = "PYPLAN_SECRETS"
+
+
+def secrets_path(name):
+    """Path of a file in the secrets directory."""
+    return os.path.join(os.environ.get(SECRETS_ENV, "secrets"), name)
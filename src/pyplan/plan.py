@@ -0,0 +1,108 @@
+"""Reconcile a desired schedule with the calendar in as few writes as possible."""
+
+import hashlib
+import json
+
+from pyplan.store import to_timestamp
+
+# Fields compared between current and desired events. Server-managed fields
+# such as etag, updated and htmlLink never count as a change.
+CONTENT_FIELDS = (
+    "summary",
+    "description",
+    "location",
+    "colorId",
+    "start",
+    "end",
+    "attendees",
+    "recurrence",
+    "reminders",
+    "transparency",
+    "visibility",
+)
+
+
+def _normalize(key, value):
+    """Compare times by the instant they name, not by how they are written."""
+    if key in ("start", "end"):
+        if "dateTime" in value:
+            return {"dateTime": round(to_timestamp(value["dateTime"]))}
+        return {"date": value.get("date")}
+    return value
+
+
+def content(body):
+    """The comparable content of an event body, without unset fields."""
+    return {
+        key: _normalize(key, body[key])
+        for key in CONTENT_FIELDS
+        if body.get(key) is not None
+    }
+
+
+def content_hash(body):
+    """A digest of an event's content, equal for events that look the same."""
+    encoded = json.dumps(content(body), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def changed_fields(current, desired):
+    """The fields of desired that differ from current, as a patch body."""
+    have = content(current)
+    return {
+        key: desired[key]
+        for key, value in content(desired).items()
+        if have.get(key) != value
+    }
+
+
+def plan_changes(current, desired, delete_missing=False):
+    """The patch, insert and delete operations that turn current into desired.
+
+    Desired bodies with the id of a current event are patched with just
+    their changed fields. The others are matched by content hash against
+    the current events no id claimed, and only inserted when nothing
+    matches. With delete_missing, current events left unmatched are deleted.
+
+    Returns (op, event_id, body) tuples for queue_changes().
+    """
+    by_id = {event["id"]: event for event in current}
+    claimed = set()
+    changes = []
+    unmatched = []
+
+    for body in desired:
+        event_id = body.get("id")
+        if event_id in by_id:
+            claimed.add(event_id)
+            fields = changed_fields(by_id[event_id], body)
+            if fields:
+                changes.append(("patch", event_id, fields))
+        else:
+            unmatched.append(body)
+
+    by_hash = {}
+    for event in current:
+        if event["id"] not in claimed:
+            by_hash.setdefault(content_hash(event), []).append(event["id"])
+
+    for body in unmatched:
+        matches = by_hash.get(content_hash(body))
+        if matches:
+            claimed.add(matches.pop(0))
+        else:
+            changes.append(("insert", None, body))
+
+    if delete_missing:
+        changes += [
+            ("delete", event["id"], None)
+            for event in current
+            if event["id"] not in claimed
+        ]
+    return changes
+
+
+def queue_changes(writer, changes):
+    """Queue planned changes on a BatchWriter."""
+    for op, event_id, body in changes:
+        writer.queue(op, event_id, body)
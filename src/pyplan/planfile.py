@@ -0,0 +1,116 @@
+"""Write a script's intended operations to a JSON lines plan and apply it later.
+
+With --plan FILE a script computes everything as usual but its BatchWriters
+record their operations instead of sending them. Each line of the plan is
+one operation:
+
+    {"calendar_id": "primary", "op": "patch", "event_id": "...", "body": {...}}
+
+A "snapshot" operation holds the events a script would have saved for
+restore before changing them; applying the plan saves them first.
+
+--apply FILE sends a reviewed plan in batches, one worker per calendar.
+"""
+
+import contextlib
+import datetime
+import json
+import sys
+
+from pyplan import batch
+from pyplan.parallel import for_each_calendar
+from pyplan.snapshots import SnapshotStore
+
+
+def write_plan(records, path):
+    """Write plan records as JSON lines; "-" writes to stdout."""
+    with contextlib.ExitStack() as stack:
+        if path == "-":
+            file = sys.stdout
+        else:
+            file = stack.enter_context(open(path, "w", encoding="utf-8"))
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextlib.contextmanager
+def planning(path):
+    """Record the writes made inside the block to path instead of sending them.
+
+    With path None the block runs normally.
+    """
+    if path is None:
+        yield
+        return
+
+    recorder = batch.recording = batch.PlanRecorder()
+    try:
+        yield
+    finally:
+        batch.recording = None
+
+    write_plan(recorder.records, path)
+    if path != "-":
+        print(f"Planned {len(recorder.records)} operations in {path}")
+
+
+def read_plan(path):
+    """Load a plan file as lists of records by calendar ID, in file order."""
+    by_calendar = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                by_calendar.setdefault(record["calendar_id"], []).append(record)
+    return by_calendar
+
+
+def apply_calendar(service, calendar_id, records):
+    """Send one calendar's planned operations in batches and return the results."""
+    snapshots = [record for record in records if record["op"] == "snapshot"]
+    records = [record for record in records if record["op"] != "snapshot"]
+    if snapshots:
+        store = SnapshotStore()
+        try:
+            for record in snapshots:
+                day = datetime.date.fromisoformat(record["body"]["day"])
+                store.save(calendar_id, day, record["body"]["events"])
+        finally:
+            store.close()
+
+    writer = batch.BatchWriter(service, calendar_id)
+    for record in records:
+        writer.queue(record["op"], record["event_id"], record["body"])
+
+    results = writer.execute()
+    failed = 0
+    for result in results:
+        if result["error"]:
+            failed += 1
+            print(
+                f"Failed to {result['op']} event {result['event_id']}: "
+                f"{result['error']}"
+            )
+    print(
+        f"Applied {len(records) - failed} of {len(records)} operations to {calendar_id}"
+    )
+    return results
+
+
+def apply_plan(path, max_workers):
+    """Apply a plan file, each calendar's operations on its own worker.
+
+    Returns the results by calendar ID, as for_each_calendar does.
+    """
+    by_calendar = read_plan(path)
+    if not by_calendar:
+        print("The plan has no operations.")
+        return {}
+
+    return for_each_calendar(
+        list(by_calendar),
+        lambda service, calendar_id: apply_calendar(
+            service, calendar_id, by_calendar[calendar_id]
+        ),
+        max_workers=max_workers,
+    )
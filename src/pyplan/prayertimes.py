@@ -0,0 +1,368 @@
+"""Prayer times calculated locally from the sun's position, plus an API cache.
+
+The calculation follows the solar-angle methods used by the Aladhan API and
+praytimes.org: Fajr and Isha are the times the sun is a method-specific
+angle below the horizon, Asr is when shadows reach one (or two) object
+lengths, and Sunrise and Maghrib are the apparent sunrise and sunset.
+
+A location is a (city, country) pair, calculated for when it is in CITIES,
+or (latitude, longitude, timezone) coordinates, calculated for anywhere.
+"""
+
+import argparse
+import json
+import math
+import os.path
+import sqlite3
+from datetime import datetime, time, timedelta
+
+import pytz
+
+from pyplan.paths import secrets_path
+
+PRAYER_TIMES_FILE = secrets_path("prayer-times.db")
+
+# Aladhan method IDs: Fajr and Isha sun angles in degrees, or Isha as
+# minutes after Maghrib, and Maghrib as an angle when it isn't sunset
+METHODS = {
+    0: {"name": "Shia Ithna-Ashari", "fajr": 16, "isha": 14, "maghrib": 4},
+    1: {"name": "University of Islamic Sciences, Karachi", "fajr": 18, "isha": 18},
+    2: {"name": "Islamic Society of North America", "fajr": 15, "isha": 15},
+    3: {"name": "Muslim World League", "fajr": 18, "isha": 17},
+    4: {"name": "Umm Al-Qura University, Makkah", "fajr": 18.5, "isha_minutes": 90},
+    5: {"name": "Egyptian General Authority of Survey", "fajr": 19.5, "isha": 17.5},
+    7: {
+        "name": "Institute of Geophysics, University of Tehran",
+        "fajr": 17.7,
+        "isha": 14,
+        "maghrib": 4.5,
+    },
+    13: {"name": "Diyanet İşleri Başkanlığı, Turkey", "fajr": 18, "isha": 17},
+}
+DEFAULT_METHOD = 2
+
+# Shadow length factor at Asr: 1 for the standard schools, 2 for Hanafi
+ASR_FACTORS = {"standard": 1, "hanafi": 2}
+
+# Sun altitude at apparent sunrise and sunset, for refraction and its radius
+RISE_SET_ANGLE = 0.833
+
+# Latitude, longitude and time zone of the cities the scripts know
+CITIES = {
+    ("Istanbul", "Turkey"): (41.0082, 28.9784, "Europe/Istanbul"),
+    ("Ankara", "Turkey"): (39.9334, 32.8597, "Europe/Istanbul"),
+    ("Izmir", "Turkey"): (38.4237, 27.1428, "Europe/Istanbul"),
+    ("Mecca", "Saudi Arabia"): (21.4225, 39.8262, "Asia/Riyadh"),
+    ("Cairo", "Egypt"): (30.0444, 31.2357, "Africa/Cairo"),
+    ("London", "United Kingdom"): (51.5074, -0.1278, "Europe/London"),
+    ("New York", "United States"): (40.7128, -74.0060, "America/New_York"),
+}
+DEFAULT_LOCATION = ("Istanbul", "Turkey")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prayer_times (
+    city TEXT NOT NULL,
+    country TEXT NOT NULL,
+    method INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    timings TEXT NOT NULL,
+    source TEXT NOT NULL,
+    timezone TEXT,
+    PRIMARY KEY (city, country, method, day)
+);
+"""
+
+
+def parse_location(value):
+    """Parse a "City,Country" or "Latitude,Longitude,Timezone" command line value."""
+    parts = [part.strip() for part in value.split(",")]
+    if len(parts) == 3:
+        try:
+            latitude, longitude = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+        else:
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise argparse.ArgumentTypeError(f"coordinates out of range: {value!r}")
+            if parts[2] not in pytz.all_timezones_set:
+                raise argparse.ArgumentTypeError(f"unknown time zone {parts[2]!r}")
+            return latitude, longitude, parts[2]
+
+    city, _, country = value.partition(",")
+    if not country.strip():
+        raise argparse.ArgumentTypeError(
+            f"expected CITY,COUNTRY or LAT,LON,TZ, got {value!r}"
+        )
+    return city.strip(), country.strip()
+
+
+def is_coordinates(location):
+    return len(location) == 3
+
+
+def location_name(location):
+    """A location's city, or its coordinates."""
+    if is_coordinates(location):
+        return f"{location[0]:g},{location[1]:g}"
+    return location[0]
+
+
+def location_place(location):
+    """(latitude, longitude, timezone) of a location, or None if unknown."""
+    if is_coordinates(location):
+        return location
+    return CITIES.get(location)
+
+
+def cache_key(location):
+    """The (city, country) a location's timings are cached under.
+
+    Coordinates are cached under "LAT,LON" and their time zone, as the local
+    times depend on both.
+    """
+    if is_coordinates(location):
+        return location_name(location), location[2]
+    return location
+
+
+def _sin(degrees):
+    return math.sin(math.radians(degrees))
+
+
+def _cos(degrees):
+    return math.cos(math.radians(degrees))
+
+
+def julian_day(day):
+    """Julian day number at 0h UTC of a date."""
+    year, month = day.year, day.month
+    if month <= 2:
+        year -= 1
+        month += 12
+    century = year // 100
+    correction = 2 - century + century // 4
+    return (
+        math.floor(365.25 * (year + 4716))
+        + math.floor(30.6001 * (month + 1))
+        + day.day
+        + correction
+        - 1524.5
+    )
+
+
+def sun_position(jd):
+    """The sun's declination (degrees) and the equation of time (hours)."""
+    days = jd - 2451545.0
+    anomaly = (357.529 + 0.98560028 * days) % 360
+    mean_longitude = (280.459 + 0.98564736 * days) % 360
+    longitude = (
+        mean_longitude + 1.915 * _sin(anomaly) + 0.020 * _sin(2 * anomaly)
+    ) % 360
+    obliquity = 23.439 - 0.00000036 * days
+
+    right_ascension = (
+        math.degrees(math.atan2(_cos(obliquity) * _sin(longitude), _cos(longitude)))
+        / 15
+    ) % 24
+    declination = math.degrees(math.asin(_sin(obliquity) * _sin(longitude)))
+    equation = mean_longitude / 15 - right_ascension
+    # Keep the equation of time within half a day of zero
+    equation = (equation + 12) % 24 - 12
+    return declination, equation
+
+
+class _Day:
+    """Solar events of one date at one place, in hours of local solar time."""
+
+    def __init__(self, day, latitude, longitude):
+        self.latitude = latitude
+        self.jd = julian_day(day) - longitude / (15 * 24)
+
+    def noon(self, hour):
+        _, equation = sun_position(self.jd + hour / 24)
+        return (12 - equation) % 24
+
+    def angle_time(self, angle, hour, before_noon):
+        """When the sun is angle degrees below the horizon, or None if never."""
+        declination, _ = sun_position(self.jd + hour / 24)
+        cosine = (-_sin(angle) - _sin(declination) * _sin(self.latitude)) / (
+            _cos(declination) * _cos(self.latitude)
+        )
+        if not -1 <= cosine <= 1:
+            return None
+        offset = math.degrees(math.acos(cosine)) / 15
+        noon = self.noon(hour)
+        return noon - offset if before_noon else noon + offset
+
+    def asr(self, factor, hour):
+        declination, _ = sun_position(self.jd + hour / 24)
+        angle = -math.degrees(
+            math.atan(
+                1 / (factor + math.tan(math.radians(abs(self.latitude - declination))))
+            )
+        )
+        return self.angle_time(angle, hour, before_noon=False)
+
+
+def calculate(day, latitude, longitude, method=DEFAULT_METHOD, asr="standard"):
+    """Prayer times of a date as hours after 0h UTC, keyed like Aladhan timings.
+
+    Where the sun never reaches the Fajr or Isha angle, as in high latitude
+    summers, the time is put that fraction of the night (angle / 60) before
+    sunrise or after sunset.
+    """
+    settings = METHODS[method]
+    solar = _Day(day, latitude, longitude)
+
+    # Each time is computed once from the sun's position at a rough guess of
+    # it, as praytimes.org does
+    sunrise = solar.angle_time(RISE_SET_ANGLE, 6, before_noon=True)
+    sunset = solar.angle_time(RISE_SET_ANGLE, 18, before_noon=False)
+    if sunrise is None or sunset is None:
+        raise ValueError(f"The sun does not rise or set at latitude {latitude}")
+    night = 24 - (sunset - sunrise)
+
+    fajr = solar.angle_time(settings["fajr"], 5, before_noon=True)
+    if fajr is None or sunrise - fajr > settings["fajr"] / 60 * night:
+        fajr = sunrise - settings["fajr"] / 60 * night
+
+    if "maghrib" in settings:
+        maghrib = solar.angle_time(settings["maghrib"], 18, before_noon=False)
+    else:
+        maghrib = sunset
+
+    if "isha_minutes" in settings:
+        isha = maghrib + settings["isha_minutes"] / 60
+    else:
+        isha = solar.angle_time(settings["isha"], 18, before_noon=False)
+        if isha is None or isha - sunset > settings["isha"] / 60 * night:
+            isha = sunset + settings["isha"] / 60 * night
+
+    times = {
+        "Fajr": fajr,
+        "Sunrise": sunrise,
+        "Dhuhr": solar.noon(12),
+        "Asr": solar.asr(ASR_FACTORS[asr], 13),
+        "Sunset": sunset,
+        "Maghrib": maghrib,
+        "Isha": isha,
+    }
+    # From local solar time to UTC
+    return {name: hours - longitude / 15 for name, hours in times.items()}
+
+
+def local_timings(day, latitude, longitude, timezone, method=DEFAULT_METHOD):
+    """Prayer times of a date as local "HH:MM" strings, like the Aladhan API."""
+    zone = pytz.timezone(timezone)
+    midnight = datetime.combine(day, time.min)
+    timings = {}
+    for name, hours in calculate(day, latitude, longitude, method).items():
+        moment = pytz.utc.localize(midnight + timedelta(hours=hours))
+        # Round to the nearest minute, as the API does
+        moment = (moment + timedelta(seconds=30)).astimezone(zone)
+        timings[name] = moment.strftime("%H:%M")
+    return timings
+
+
+def calculate_range(start, days, latitude, longitude, timezone, method=DEFAULT_METHOD):
+    """Yield (date, timings) for days consecutive dates from start."""
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        yield day, local_timings(day, latitude, longitude, timezone, method)
+
+
+class PrayerTimeCache:
+    """Prayer timings by city, country, method and date, kept across runs.
+
+    Timings are local times, so each is stored with the time zone they are in.
+    """
+
+    def __init__(self, path=PRAYER_TIMES_FILE):
+        # Offline commands may be the first to use the secrets directory
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(prayer_times)")}
+        if "timezone" not in columns:
+            # Cached before time zones were kept; those rows have none
+            self.db.execute("ALTER TABLE prayer_times ADD COLUMN timezone TEXT")
+
+    def close(self):
+        self.db.close()
+
+    def get(self, city, country, method, day):
+        """(timings, timezone) of a date, or None; timezone may be None."""
+        row = self.db.execute(
+            "SELECT timings, timezone FROM prayer_times "
+            "WHERE city = ? AND country = ? AND method = ? AND day = ?",
+            (city, country, method, day.isoformat()),
+        ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def put(self, city, country, method, day, timings, source, timezone):
+        """Store timings; source records where they came from, e.g. "api"."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO prayer_times VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    city,
+                    country,
+                    method,
+                    day.isoformat(),
+                    json.dumps(timings),
+                    source,
+                    timezone,
+                ),
+            )
+
+    def fill(self, location, start, days, method=DEFAULT_METHOD):
+        """Calculate and store days of timings for a city in CITIES or coordinates.
+
+        Dates already cached, e.g. from the API, are kept.
+        """
+        city, country = cache_key(location)
+        latitude, longitude, timezone = location_place(location)
+        with self.db:
+            for day, timings in calculate_range(
+                start, days, latitude, longitude, timezone, method
+            ):
+                self.db.execute(
+                    "INSERT OR IGNORE INTO prayer_times VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        city,
+                        country,
+                        method,
+                        day.isoformat(),
+                        json.dumps(timings),
+                        "calculated",
+                        timezone,
+                    ),
+                )
+
+
+def cached_timings(cache, location, day, method=DEFAULT_METHOD, fetch=None):
+    """(timings, timezone) of a date from the cache, fetch or the calculation.
+
+    fetch(location, day, method) is asked when the cache has nothing and
+    returns (timings, timezone) or None; the calculation is the fallback for
+    cities in CITIES and for coordinates. Whatever is found is cached.
+    Returns (None, None) when nothing is.
+    """
+    city, country = cache_key(location)
+    place = location_place(location)
+    timings, timezone = cache.get(city, country, method, day) or (None, None)
+    if timings is not None and timezone is None:
+        # Cached without its time zone, which only a known place can tell
+        timezone = place[2] if place else None
+        if timezone is None:
+            timings = None
+    if timings is None and fetch is not None:
+        fetched = fetch(location, day, method)
+        if fetched:
+            timings, timezone = fetched
+            cache.put(city, country, method, day, timings, "api", timezone)
+    if timings is None and place is not None:
+        latitude, longitude, timezone = place
+        timings = local_timings(day, latitude, longitude, timezone, method)
+        cache.put(city, country, method, day, timings, "calculated", timezone)
+    return timings, timezone
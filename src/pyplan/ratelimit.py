@@ -0,0 +1,49 @@
+"""Process-wide rate limiting for Calendar API calls."""
+
+import asyncio
+import threading
+import time
+
+# The default Calendar quota is 600 queries per minute per user. Allow short
+# bursts, such as a full batch, and sustain the per-second average.
+QUERIES_PER_SECOND = 10
+BURST = 100
+
+
+class RateLimiter:
+    """Token bucket shared by every thread making API calls.
+
+    A caller may take more tokens than the bucket holds, e.g. for a batch; the
+    bucket then goes into debt and later callers wait it off.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, count=1):
+        """Take count tokens and return how many seconds to wait before sending."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= count
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def acquire(self, count=1):
+        wait = self.reserve(count)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, count=1):
+        wait = self.reserve(count)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+calendar_limiter = RateLimiter(QUERIES_PER_SECOND, BURST)
@@ -0,0 +1,186 @@
+"""Proportional rescaling of event spans, separate from any API I/O.
+
+Spans are given as sequences of epoch-second starts and ends and new spans
+are returned as arrays in the same order. NumPy is used when installed;
+otherwise the same plans are computed over array.array with plain loops.
+"""
+
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional
+    numpy = None
+
+
+def as_array(values):
+    """A float array of values, backed by NumPy when available."""
+    if numpy is not None:
+        return numpy.asarray(values, dtype=float)
+    return array("d", values)
+
+
+def _mask(pinned, count):
+    """Which of count events may be resized, given the pinned flags."""
+    if numpy is not None:
+        if pinned is None:
+            return numpy.ones(count, dtype=bool)
+        return ~numpy.asarray(pinned, dtype=bool)
+    if pinned is None:
+        return [True] * count
+    return [not flag for flag in pinned]
+
+
+def _durations(starts, ends):
+    if numpy is not None:
+        return ends - starts
+    return array("d", (end - start for start, end in zip(starts, ends)))
+
+
+def _sum_where(values, mask=None):
+    """Sum of values, or of those where mask is true."""
+    if numpy is not None:
+        return float(values.sum() if mask is None else values[mask].sum())
+    if mask is None:
+        return sum(values)
+    return sum(value for value, on in zip(values, mask) if on)
+
+
+def fit_durations(durations, available, flexible, min_duration=0.0):
+    """Scale the flexible durations to sum to available, keeping proportions.
+
+    Durations that would drop below min_duration are held at it and the rest
+    share what is left. Durations of events that aren't flexible are returned
+    unchanged. If the minimums alone exceed available, every flexible event
+    gets min_duration.
+    """
+    if numpy is not None:
+        durations = numpy.asarray(durations, dtype=float)
+        flexible = numpy.asarray(flexible, dtype=bool)
+        floored = numpy.zeros(len(durations), dtype=bool)
+        result = durations.copy()
+        while True:
+            active = flexible & ~floored
+            budget = available - min_duration * floored.sum()
+            total = durations[active].sum()
+            factor = budget / total if total > 0 else 0.0
+            scaled = durations * factor
+            below = active & (scaled < min_duration)
+            if not below.any():
+                break
+            floored |= below
+        result[active] = scaled[active]
+        result[floored] = min_duration
+        return result
+
+    floored = [False] * len(durations)
+    while True:
+        active = [free and not low for free, low in zip(flexible, floored)]
+        budget = available - min_duration * sum(floored)
+        total = sum(d for d, on in zip(durations, active) if on)
+        factor = budget / total if total > 0 else 0.0
+        below = [on and d * factor < min_duration for d, on in zip(durations, active)]
+        if not any(below):
+            break
+        floored = [low or new for low, new in zip(floored, below)]
+    return array(
+        "d",
+        (
+            min_duration if low else d * factor if on else d
+            for d, on, low in zip(durations, active, floored)
+        ),
+    )
+
+
+def _snap(values, origin, grid):
+    """Round values to the nearest multiple of grid seconds from origin."""
+    if not grid:
+        return values
+    if numpy is not None:
+        return origin + numpy.round((values - origin) / grid) * grid
+    return array("d", (origin + round((v - origin) / grid) * grid for v in values))
+
+
+def _lay_out(durations, gap_start, gap_end, min_duration, grid):
+    """Boundaries of durations laid back to back to fill [gap_start, gap_end].
+
+    The boundaries between events are rounded to grid; the last one is not,
+    so the events end where the gap does.
+    """
+    sizes = fit_durations(
+        durations, gap_end - gap_start, _mask(None, len(durations)), min_duration
+    )
+    if numpy is not None:
+        bounds = gap_start + numpy.concatenate(([0.0], numpy.cumsum(sizes)))
+        last = bounds[-1]
+        bounds = _snap(bounds, gap_start, grid)
+    else:
+        bounds = array("d", accumulate(sizes, initial=gap_start))
+        last = bounds[-1]
+        bounds = _snap(bounds, gap_start, grid)
+    bounds[-1] = last
+    return bounds
+
+
+def squeeze(
+    starts, ends, window_start, window_end, pinned=None, min_duration=0.0, grid=None
+):
+    """Lay events back to back so they fill the window around pinned ones.
+
+    Pinned events keep their span and split the window into gaps. The
+    flexible events between two pinned ones, in the given order, fill the
+    gap between them, each with a share proportional to its original
+    duration; every gap is scaled separately. With grid (seconds), the
+    boundaries between laid out events are rounded to that grid.
+
+    >>> starts, ends = squeeze([0, 1, 2], [1, 2, 3], 0, 6, [False, True, False])
+    >>> [(float(start), float(end)) for start, end in zip(starts, ends)]
+    [(0.0, 1.0), (1.0, 2.0), (2.0, 6.0)]
+    """
+    starts, ends = as_array(starts), as_array(ends)
+    flexible = _mask(pinned, len(starts))
+    durations = _durations(starts, ends)
+    if numpy is not None:
+        new_starts, new_ends = starts.copy(), ends.copy()
+    else:
+        new_starts, new_ends = array("d", starts), array("d", ends)
+
+    # Runs of flexible events between pinned ones, and the free time they fill
+    pins = [index for index, free in enumerate(flexible) if not free]
+    cursor = window_start
+    for first, stop in zip([0] + [pin + 1 for pin in pins], pins + [len(starts)]):
+        gap_end = window_end
+        if stop < len(starts):
+            gap_end = max(cursor, min(starts[stop], window_end))
+        if first < stop:
+            bounds = _lay_out(
+                durations[first:stop], cursor, gap_end, min_duration, grid
+            )
+            new_starts[first:stop] = bounds[:-1]
+            new_ends[first:stop] = bounds[1:]
+        if stop < len(starts):
+            cursor = max(cursor, min(ends[stop], window_end))
+    return new_starts, new_ends
+
+
+def shrink_by(starts, ends, amount, pinned=None, min_duration=0.0, grid=None):
+    """Shorten events in place so together they give up amount seconds.
+
+    Starts are kept and each flexible event loses time in proportion to its
+    duration; pinned events are unchanged. With grid (seconds), the new
+    durations are rounded to that grid. Returns the new ends.
+    """
+    starts, ends = as_array(starts), as_array(ends)
+    flexible = _mask(pinned, len(starts))
+    durations = _durations(starts, ends)
+
+    flexible_time = _sum_where(durations, flexible)
+    sizes = fit_durations(
+        durations, max(flexible_time - amount, 0.0), flexible, min_duration
+    )
+    sizes = _snap(sizes, 0.0, grid)
+
+    if numpy is not None:
+        return starts + sizes
+    return array("d", (s + size for s, size in zip(starts, sizes)))
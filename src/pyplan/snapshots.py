@@ -0,0 +1,180 @@
+"""Append-only store of event snapshots taken before a script rewrites a day."""
+
+import json
+import os.path
+import sqlite3
+from datetime import date, datetime, timezone
+
+from pyplan.paths import secrets_path
+
+SNAPSHOT_FILE = secrets_path("snapshots.db")
+
+# Where shrink kept its single snapshot before this store existed
+LEGACY_SNAPSHOT_FILE = secrets_path("original_events_full.json")
+
+# The fields restore writes back
+SNAPSHOT_FIELDS = (
+    "id",
+    "summary",
+    "location",
+    "description",
+    "start",
+    "end",
+    "attendees",
+    "recurrence",
+    "reminders",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    calendar_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_day ON snapshots (calendar_id, day);
+CREATE TABLE IF NOT EXISTS snapshot_events (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    position INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, position)
+);
+"""
+
+
+def legacy_snapshot_file(calendar_id):
+    """The JSON snapshot older versions of shrink wrote for a calendar."""
+    if calendar_id == "primary":
+        return LEGACY_SNAPSHOT_FILE
+    return secrets_path(f"original_events_{calendar_id}.json")
+
+
+def snapshot_body(event):
+    """The part of an event body a snapshot keeps."""
+    body = {key: event.get(key) for key in SNAPSHOT_FIELDS}
+    body["summary"] = event.get("summary", "No Title")
+    return body
+
+
+def describe(row):
+    """One line about a snapshot, from a SnapshotStore.snapshots() row."""
+    snapshot_id, calendar_id, day, taken_at, count = row
+    taken = datetime.fromtimestamp(taken_at, timezone.utc)
+    return (
+        f"{snapshot_id:5}  {calendar_id}  {day}  "
+        f"taken {taken:%Y-%m-%d %H:%M}  {count} events"
+    )
+
+
+class SnapshotStore:
+    """Snapshots of a calendar's events, keyed by calendar and day.
+
+    Each save adds a new snapshot in one transaction, so earlier snapshots
+    are never overwritten and an interrupted save leaves no partial one.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        # Offline commands may be the first to use the secrets directory
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def save(self, calendar_id, day, events, taken_at=None):
+        """Store the events as a new snapshot of a day and return its ID."""
+        if taken_at is None:
+            taken_at = datetime.now(timezone.utc).timestamp()
+        with self.db:
+            snapshot_id = self.db.execute(
+                "INSERT INTO snapshots (calendar_id, day, taken_at) VALUES (?, ?, ?)",
+                (calendar_id, day.isoformat(), taken_at),
+            ).lastrowid
+            self.db.executemany(
+                "INSERT INTO snapshot_events VALUES (?, ?, ?)",
+                (
+                    (
+                        snapshot_id,
+                        position,
+                        json.dumps(
+                            snapshot_body(event),
+                            separators=(",", ":"),
+                            ensure_ascii=False,
+                        ),
+                    )
+                    for position, event in enumerate(events)
+                ),
+            )
+        return snapshot_id
+
+    def snapshots(self, calendar_id=None):
+        """(id, calendar_id, day, taken_at, event count) rows, newest first."""
+        query = """
+            SELECT s.id, s.calendar_id, s.day, s.taken_at, COUNT(e.position)
+            FROM snapshots s LEFT JOIN snapshot_events e ON e.snapshot_id = s.id
+        """
+        params = []
+        if calendar_id is not None:
+            query += " WHERE s.calendar_id = ?"
+            params.append(calendar_id)
+        query += " GROUP BY s.id ORDER BY s.id DESC"
+        return [
+            (row[0], row[1], date.fromisoformat(row[2]), row[3], row[4])
+            for row in self.db.execute(query, params)
+        ]
+
+    def find(self, calendar_id, day=None):
+        """ID of the first snapshot of one day of a calendar.
+
+        Without a day, the day of the calendar's latest snapshot is used.
+        Later snapshots of a day were taken after it was already rewritten,
+        so the first one holds the times from before.
+        """
+        if day is None:
+            row = self.db.execute(
+                "SELECT day FROM snapshots WHERE calendar_id = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (calendar_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            day = date.fromisoformat(row[0])
+        row = self.db.execute(
+            "SELECT id FROM snapshots WHERE calendar_id = ? AND day = ? "
+            "ORDER BY id LIMIT 1",
+            (calendar_id, day.isoformat()),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get(self, snapshot_id):
+        """(calendar_id, day, events) of a snapshot, or None if there is none."""
+        row = self.db.execute(
+            "SELECT calendar_id, day FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        events = [
+            json.loads(body)
+            for (body,) in self.db.execute(
+                "SELECT body FROM snapshot_events WHERE snapshot_id = ? "
+                "ORDER BY position",
+                (snapshot_id,),
+            )
+        ]
+        return row[0], date.fromisoformat(row[1]), events
+
+    def import_legacy(self, calendar_id):
+        """Import a calendar's old JSON snapshot file, if there is one.
+
+        The file is left in place and its modification date is used as the
+        snapshot's day. Returns the new snapshot ID or None.
+        """
+        path = legacy_snapshot_file(calendar_id)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            events = json.load(file)
+        modified = os.path.getmtime(path)
+        day = datetime.fromtimestamp(modified, timezone.utc).date()
+        return self.save(calendar_id, day, events, taken_at=modified)
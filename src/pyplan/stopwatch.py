@@ -0,0 +1,200 @@
+"""Move the rest of the day as a stopwatch times the running event.
+
+A Stopwatch holds today's timed events and the one being timed. While that
+event runs past its planned end, its end follows the clock and the events
+right after it are pushed back; when it is stopped early, the events that
+followed it back to back move up. Events past a free gap large enough to
+absorb the change keep their times. If pushed events would run past the
+end of the day, everything after the running event is squeezed into the
+time left, as shrink does.
+
+Clock readings are rounded to a grid, so a tick every few seconds only
+changes the layout once per grid step, and a tick that changes nothing
+costs a comparison. Nothing here calls the API: changes() gives the patches
+for the events moved since they were last written, and a Debouncer decides
+when a settled layout is worth sending.
+"""
+
+import math
+
+from pyplan.plan import plan_changes
+from pyplan.rescale import squeeze
+
+# Clock readings are rounded to whole minutes by default
+DEFAULT_GRID = 60
+
+
+class Stopwatch:
+    """Today's timed events, laid out around the one being timed."""
+
+    def __init__(self, events, day_end, grid=DEFAULT_GRID, min_duration=0.0):
+        self.events = sorted(
+            (event for event in events if not event.all_day),
+            key=lambda event: (event.start, event.end),
+        )
+        self.day_end = day_end
+        self.grid = grid
+        self.min_duration = min_duration
+        # The times layouts are computed from, as of the last stop()
+        self.base = [(event.start, event.end) for event in self.events]
+        self.current = None
+        self.started = None
+        self.finish = None
+        # Index of the event stopped last
+        self.stopped = None
+        # Events the current layout moves off their base times
+        self.shifted = set()
+        # Events whose times may differ from what the calendar has
+        self.moved = set()
+
+    @property
+    def running(self):
+        """The event being timed, or None."""
+        return None if self.current is None else self.events[self.current]
+
+    def find(self, clock, event_id=None):
+        """Index of the event with event_id, or the first one not over by clock."""
+        for index, (start, end) in enumerate(self.base):
+            if event_id is None and end > clock or self.events[index].id == event_id:
+                return index
+        return None
+
+    def start(self, clock, index=None):
+        """Start timing the event at index, by default the next one; returns it."""
+        if index is None:
+            last = self.stopped if self.current is None else self.current
+            index = self.find(clock) if last is None else last + 1
+        if index is None or index >= len(self.events):
+            self.current = None
+            return None
+        # The events are at their base times until the clock passes its end
+        self.current, self.started, self.finish = index, clock, self.base[index][1]
+        return self.events[index]
+
+    def _round(self, clock, rounding=round):
+        if not self.grid:
+            return clock
+        return rounding(clock / self.grid) * self.grid
+
+    def tick(self, clock):
+        """Advance the running event to clock; True when the layout changed."""
+        if self.current is None:
+            return False
+        planned_end = self.base[self.current][1]
+        finish = planned_end
+        if clock > planned_end:
+            finish = self._round(clock, math.ceil)
+        return self._finish_at(finish)
+
+    def stop(self, clock):
+        """End the running event at clock; True when the layout changed.
+
+        The layout is kept as the base of the next event timed.
+        """
+        if self.current is None:
+            return False
+        start = self.base[self.current][0]
+        changed = self._finish_at(max(self._round(clock), start + self.min_duration))
+        self.base = [(event.start, event.end) for event in self.events]
+        self.shifted = set()
+        self.stopped, self.current, self.finish = self.current, None, None
+        return changed
+
+    def _finish_at(self, finish):
+        if finish == self.finish:
+            return False
+        self.finish = finish
+        self._layout(finish)
+        return True
+
+    def _layout(self, finish):
+        """Move the events after the running one for it to end at finish."""
+        events, base, current = self.events, self.base, self.current
+        # Start over from the base times rather than undo the last layout
+        for index in self.shifted:
+            events[index].start, events[index].end = base[index]
+
+        events[current].end = finish
+        shifted = {current}
+        planned_end = base[current][1]
+        later = range(current + 1, len(events))
+
+        if finish > planned_end:
+            cursor = finish
+            for index in later:
+                start, end = base[index]
+                if start >= cursor:
+                    break
+                events[index].start, events[index].end = cursor, cursor + end - start
+                cursor = events[index].end
+                shifted.add(index)
+            if cursor > self.day_end and later:
+                starts, ends = squeeze(
+                    [base[index][0] for index in later],
+                    [base[index][1] for index in later],
+                    finish,
+                    self.day_end,
+                    min_duration=self.min_duration,
+                    grid=self.grid,
+                )
+                for index, start, end in zip(later, starts, ends):
+                    events[index].start, events[index].end = float(start), float(end)
+                shifted.update(later)
+
+        elif finish < planned_end:
+            slack, previous_end = planned_end - finish, planned_end
+            for index in later:
+                start, end = base[index]
+                if start > previous_end:
+                    break
+                events[index].start, events[index].end = start - slack, end - slack
+                previous_end = max(previous_end, end)
+                shifted.add(index)
+
+        self.shifted = shifted
+        self.moved |= shifted
+
+    def changes(self):
+        """Patches for the moved events whose times differ from the calendar's."""
+        moved = [self.events[index] for index in sorted(self.moved)]
+        return plan_changes(
+            [event.body for event in moved], [event.to_body() for event in moved]
+        )
+
+    def sent(self, failed=()):
+        """Record that the changes went out, except for the failed event IDs."""
+        still_moved = set()
+        for index in self.moved:
+            event = self.events[index]
+            if event.id in failed:
+                still_moved.add(index)
+            else:
+                event.body = event.to_body()
+        self.moved = still_moved
+
+
+class Debouncer:
+    """Hold changes back until they settle.
+
+    Changes are due once settle seconds pass without another one, or
+    max_wait seconds after the first one still unsent, whichever is first.
+    """
+
+    def __init__(self, settle=30.0, max_wait=300.0):
+        self.settle = settle
+        self.max_wait = max_wait
+        self.first = None
+        self.last = None
+
+    def changed(self, clock):
+        self.last = clock
+        if self.first is None:
+            self.first = clock
+
+    def due(self, clock):
+        if self.first is None:
+            return False
+        return clock - self.last >= self.settle or clock - self.first >= self.max_wait
+
+    def sent(self):
+        self.first = self.last = None
@@ -0,0 +1,223 @@
+"""Local event store kept fresh with Calendar syncToken incremental syncs."""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+
+from pyplan.events import iter_events, iter_pages
+from pyplan.paths import secrets_path
+
+EVENT_STORE_FILE = secrets_path("events.db")
+
+# How far back and ahead the full listing of a calendar reaches, so that
+# recurring series without an end expand to a bounded number of events. A
+# calendar is seeded again once a range falls outside its window but inside
+# a new one; other ranges are listed directly from the API instead.
+SYNC_WINDOW_DAYS = 30
+SYNC_AHEAD_DAYS = 365
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT NOT NULL,
+    window_start REAL NOT NULL,
+    window_end REAL NOT NULL
+);
+"""
+
+
+def to_timestamp(value):
+    """Convert an RFC 3339 string, date string or datetime to epoch seconds.
+
+    Naive values are taken to be UTC, like the scripts' "Z" suffixed times.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def event_timestamp(when):
+    """Epoch seconds of an event's "start" or "end" field."""
+    return to_timestamp(when.get("dateTime", when.get("date")))
+
+
+def sync_window():
+    """Start and end, in epoch seconds, of the window a new seed lists."""
+    now = datetime.now(timezone.utc)
+    return (
+        (now - timedelta(days=SYNC_WINDOW_DAYS)).timestamp(),
+        (now + timedelta(days=SYNC_AHEAD_DAYS)).timestamp(),
+    )
+
+
+def in_window(window_start, window_end, time_min, time_max=None):
+    """Whether [time_min, time_max] lies in a window.
+
+    A range without an end runs past any window.
+    """
+    return (
+        time_max is not None
+        and window_start <= to_timestamp(time_min)
+        and to_timestamp(time_max) <= window_end
+    )
+
+
+class EventStore:
+    """SQLite mirror of calendar events, seeded over a window and then synced."""
+
+    def __init__(self, service, path=EVENT_STORE_FILE):
+        self.service = service
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(sync_state)")}
+        if "window_end" not in columns:
+            # Stores seeded without an end to their window are seeded again
+            self.db.executescript("DROP TABLE sync_state;" + SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def sync(self, calendar_id="primary", time_min=None, time_max=None):
+        """Bring the stored copy of a calendar up to date.
+
+        The calendar is seeded again when [time_min, time_max] is outside
+        its window but inside a new one. Events that changed outside the
+        window are dropped, so the store only holds what covers() vouches for.
+        """
+        row = self.db.execute(
+            "SELECT sync_token, window_start, window_end FROM sync_state "
+            "WHERE calendar_id = ?",
+            (calendar_id,),
+        ).fetchone()
+        window_start, window_end = sync_window()
+        if (
+            row is not None
+            and time_min is not None
+            and not in_window(row[1], row[2], time_min, time_max)
+            and in_window(window_start, window_end, time_min, time_max)
+        ):
+            # The range has left the old window; seed one around now
+            row = None
+
+        if row is not None:
+            try:
+                events, sync_token = self._fetch(calendar_id, {"syncToken": row[0]})
+            except HttpError as error:
+                # 410 Gone means the token expired and a full sync is needed
+                if error.resp.status != 410:
+                    raise
+            else:
+                with self.db:
+                    for event in events:
+                        self._apply(calendar_id, event)
+                    self.db.execute(
+                        "DELETE FROM events WHERE calendar_id = ? "
+                        "AND (end_ts < ? OR start_ts > ?)",
+                        (calendar_id, row[1], row[2]),
+                    )
+                    self.db.execute(
+                        "UPDATE sync_state SET sync_token = ? WHERE calendar_id = ?",
+                        (sync_token, calendar_id),
+                    )
+                return
+
+        events, sync_token = self._fetch(
+            calendar_id,
+            {
+                "timeMin": datetime.fromtimestamp(
+                    window_start, timezone.utc
+                ).isoformat(),
+                "timeMax": datetime.fromtimestamp(window_end, timezone.utc).isoformat(),
+            },
+        )
+        with self.db:
+            self.db.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+            self.db.execute(
+                "DELETE FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+            )
+            for event in events:
+                self._apply(calendar_id, event)
+            self.db.execute(
+                "INSERT INTO sync_state VALUES (?, ?, ?, ?)",
+                (calendar_id, sync_token, window_start, window_end),
+            )
+
+    def _fetch(self, calendar_id, params):
+        """Every event of a listing and its sync token, read before any write.
+
+        Paging happens outside a transaction, so workers syncing other
+        calendars are not locked out of the database while it runs.
+        """
+        events = []
+        for page in iter_pages(self.service, calendar_id, singleEvents=True, **params):
+            events.extend(page.get("items", []))
+        return events, page["nextSyncToken"]
+
+    def _apply(self, calendar_id, event):
+        if event.get("status") == "cancelled":
+            self.db.execute(
+                "DELETE FROM events WHERE calendar_id = ? AND id = ?",
+                (calendar_id, event["id"]),
+            )
+            return
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)",
+            (
+                calendar_id,
+                event["id"],
+                event_timestamp(event["start"]),
+                event_timestamp(event["end"]),
+                json.dumps(event),
+            ),
+        )
+
+    def covers(self, calendar_id, time_min, time_max=None):
+        """Whether the synced window of a calendar holds [time_min, time_max]."""
+        row = self.db.execute(
+            "SELECT window_start, window_end FROM sync_state WHERE calendar_id = ?",
+            (calendar_id,),
+        ).fetchone()
+        return row is not None and in_window(row[0], row[1], time_min, time_max)
+
+    def events_between(self, calendar_id, time_min, time_max=None):
+        """Stored events overlapping [time_min, time_max), ordered by start."""
+        query = "SELECT body FROM events WHERE calendar_id = ? AND end_ts > ?"
+        params = [calendar_id, to_timestamp(time_min)]
+        if time_max is not None:
+            query += " AND start_ts < ?"
+            params.append(to_timestamp(time_max))
+        query += " ORDER BY start_ts"
+        return [json.loads(body) for (body,) in self.db.execute(query, params)]
+
+
+def list_events(service, time_min, time_max=None, calendar_id="primary", fields=None):
+    """List events in a time range from the synced local store.
+
+    Ranges outside the synced window are streamed straight from the API,
+    with fields as the partial-response mask.
+    """
+    store = EventStore(service)
+    try:
+        store.sync(calendar_id, time_min, time_max)
+        if store.covers(calendar_id, time_min, time_max):
+            return store.events_between(calendar_id, time_min, time_max)
+    finally:
+        store.close()
+
+    return list(iter_events(service, calendar_id, time_min, time_max, fields=fields))
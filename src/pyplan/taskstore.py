@@ -0,0 +1,214 @@
+"""Local mirror of Google Tasks, refreshed incrementally with updatedMin.
+
+The first sync of a task list fetches all of its tasks, page by page.
+Later syncs only ask for the tasks updated since the newest one already
+stored, deleted ones included, so a refresh of thousands of unchanged tasks
+is one short request per list. The query methods read the mirror alone and
+make no API calls.
+"""
+
+import json
+import sqlite3
+
+from pyplan.paths import secrets_path
+from pyplan.store import to_timestamp
+
+TASK_STORE_FILE = secrets_path("tasks.db")
+
+# Largest page the Tasks API serves for lists and tasks
+MAX_PAGE_SIZE = 100
+
+# Partial-response mask for the task fields the mirror keeps
+TASK_FIELDS = (
+    "id,title,notes,status,due,completed,updated,parent,position,deleted,hidden"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_lists (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    updated_min TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    list_id TEXT NOT NULL REFERENCES task_lists (id),
+    id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    due_ts REAL,
+    updated TEXT NOT NULL,
+    position TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (list_id, id)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_due ON tasks (status, due_ts);
+CREATE INDEX IF NOT EXISTS tasks_by_updated ON tasks (list_id, updated);
+"""
+
+
+def iter_items(method, max_results=MAX_PAGE_SIZE, **params):
+    """Yield the items of every page of a Tasks list call, following nextPageToken.
+
+    method is e.g. service.tasks().list.
+    """
+    page_token = None
+    while True:
+        page = method(maxResults=max_results, pageToken=page_token, **params).execute()
+        yield from page.get("items", [])
+
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def list_task_lists(service):
+    """Every task list of the user, from the API."""
+    return list(
+        iter_items(
+            service.tasklists().list, fields="nextPageToken,items(id,title,updated)"
+        )
+    )
+
+
+class TaskStore:
+    """SQLite mirror of the user's task lists and tasks."""
+
+    def __init__(self, service=None, path=TASK_STORE_FILE):
+        # Only sync() needs a service; the queries work offline
+        self.service = service
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def sync(self):
+        """Bring every task list up to date; returns the number of tasks changed."""
+        lists = list_task_lists(self.service)
+        known = {
+            list_id: updated_min
+            for list_id, updated_min in self.db.execute(
+                "SELECT id, updated_min FROM task_lists"
+            )
+        }
+
+        changed = 0
+        with self.db:
+            # Task lists deleted since the last sync take their tasks along
+            for list_id in known.keys() - {item["id"] for item in lists}:
+                self.db.execute("DELETE FROM tasks WHERE list_id = ?", (list_id,))
+                self.db.execute("DELETE FROM task_lists WHERE id = ?", (list_id,))
+
+            for item in lists:
+                updated_min = known.get(item["id"])
+                self.db.execute(
+                    "INSERT INTO task_lists (id, title) VALUES (?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET title = excluded.title",
+                    (item["id"], item["title"]),
+                )
+                changed += self._pull(item["id"], updated_min)
+        return changed
+
+    def _pull(self, list_id, updated_min):
+        """Store a list's tasks updated since updated_min, or all when None."""
+        params = {"showCompleted": True, "showHidden": True}
+        if updated_min is not None:
+            params.update(updatedMin=updated_min, showDeleted=True)
+
+        changed = 0
+        for task in iter_items(
+            self.service.tasks().list,
+            tasklist=list_id,
+            fields=f"nextPageToken,items({TASK_FIELDS})",
+            **params,
+        ):
+            self._apply(list_id, task)
+            # updatedMin is inclusive, so the newest task stored comes back
+            changed += task["updated"] != updated_min
+
+        # The newest modification time stored is where the next sync starts
+        (newest,) = self.db.execute(
+            "SELECT MAX(updated) FROM tasks WHERE list_id = ?", (list_id,)
+        ).fetchone()
+        self.db.execute(
+            "UPDATE task_lists SET updated_min = ? WHERE id = ?",
+            (newest or updated_min, list_id),
+        )
+        return changed
+
+    def _apply(self, list_id, task):
+        if task.get("deleted"):
+            self.db.execute(
+                "DELETE FROM tasks WHERE list_id = ? AND id = ?", (list_id, task["id"])
+            )
+            return
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                list_id,
+                task["id"],
+                task.get("status", "needsAction"),
+                to_timestamp(task["due"]) if task.get("due") else None,
+                task["updated"],
+                task.get("position"),
+                json.dumps(task),
+            ),
+        )
+
+    def _tasks(self, query, params):
+        """Task bodies of (list_id, body) rows, each with its list ID as "tasklist"."""
+        tasks = []
+        for list_id, body in self.db.execute(query, params):
+            task = json.loads(body)
+            task["tasklist"] = list_id
+            tasks.append(task)
+        return tasks
+
+    def task_lists(self):
+        """(id, title) of the stored task lists, by title."""
+        return self.db.execute(
+            "SELECT id, title FROM task_lists ORDER BY title"
+        ).fetchall()
+
+    def open_tasks(self, list_ids=None, due_before=None):
+        """Tasks still to do, those due first and undated ones last.
+
+        due_before, a datetime or RFC 3339 string, keeps only tasks due
+        before it; list_ids keeps only those lists.
+        """
+        query = "SELECT list_id, body FROM tasks WHERE status = 'needsAction'"
+        params = []
+        if due_before is not None:
+            query += " AND due_ts < ?"
+            params.append(to_timestamp(due_before))
+        if list_ids:
+            query += f" AND list_id IN ({', '.join('?' * len(list_ids))})"
+            params.extend(list_ids)
+        query += " ORDER BY due_ts IS NULL, due_ts, list_id, position"
+        return self._tasks(query, params)
+
+    def tasks_due(self, time_min, time_max, include_completed=False):
+        """Tasks due in [time_min, time_max), by due date."""
+        query = "SELECT list_id, body FROM tasks WHERE due_ts >= ? AND due_ts < ?"
+        if not include_completed:
+            query += " AND status = 'needsAction'"
+        return self._tasks(
+            query + " ORDER BY due_ts, list_id, position",
+            (to_timestamp(time_min), to_timestamp(time_max)),
+        )
+
+    def get(self, list_id, task_id):
+        """A stored task, or None."""
+        tasks = self._tasks(
+            "SELECT list_id, body FROM tasks WHERE list_id = ? AND id = ?",
+            (list_id, task_id),
+        )
+        return tasks[0] if tasks else None
+
+    def counts(self):
+        """{list_id: (open, completed)} task counts."""
+        counts = {list_id: [0, 0] for list_id, _ in self.task_lists()}
+        for list_id, status, count in self.db.execute(
+            "SELECT list_id, status, COUNT(*) FROM tasks GROUP BY list_id, status"
+        ):
+            counts[list_id][status == "completed"] += count
+        return {list_id: tuple(pair) for list_id, pair in counts.items()}